@@ -3,87 +3,255 @@
 
 # import necessary modules
 import os
+import json
 import time
 import shutil
-from merge_multiple_asc_dtms_fncts import MergeAscDtms, askUserForPath, askUserForHeaderComponents
+import argparse
+from merge_multiple_asc_dtms_fncts import MergeAscDtms, askUserForPath, askUserForHeaderComponents, loadStripPlan
 
-# print program name
-columns = shutil.get_terminal_size().columns
-print(os.path.basename(__file__).center(columns))
-print('-' * columns)
 
-# specify paths to input and output catalogs
-inputCatalog = askUserForPath('input')
-outputCatalog = askUserForPath('output')
+def geoTiffTileSize(value):
+    """
+    Args:
+        value - String - value of the --tile-size command line argument
+    Returns:
+        tileSize - int - width and height of GeoTIFF tiles
+    """
+    try:
+        tileSize = int(value)
+    except ValueError:
+        tileSize = None
 
-# specify header options:
-headerOptions = {
-    1 : ['ncols', 'nrows', 'xllcenter', 'yllcenter', 'cellsize', 'nodata_value'],
-    2 : ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value']
-}
+    if tileSize is None or tileSize <= 0 or tileSize % 16:
+        raise argparse.ArgumentTypeError(f'has to be a positive multiple of 16 - {value} given')
 
-# ask user for header components
-headerComponents = askUserForHeaderComponents(headerOptions)
+    return tileSize
 
-# initialize MergeAscDtms() class
-merge = MergeAscDtms(inputCatalog, outputCatalog, ' ', 'merged_dtm.asc', headerComponents)
 
+def main():
+    # parse optional command line arguments
+    argParser = argparse.ArgumentParser(description='Merge multiple *.asc DTMs into a single *.asc DTM.')
+    argParser.add_argument('--workers', type=int, default=1,
+                           help='number of processes used for loading datasets in parallel (1 by default)')
+    argParser.add_argument('--threads', type=int, default=1,
+                           help='number of threads merging datasets, which are not sharing any cells, at the same time '
+                                '(1 by default)')
+    argParser.add_argument('--streaming', action='store_true',
+                           help='load and merge datasets one at a time into a memory-mapped final DTM array')
+    argParser.add_argument('--precision', type=int, default=None,
+                           help='number of decimal places of exported heights (all digits by default)')
+    argParser.add_argument('--cache-catalog', default=None,
+                           help='catalog of the persistent cache of parsed datasets (no cache by default)')
+    argParser.add_argument('--cache-size-limit', type=float, default=10,
+                           help='max size of the cache in GB (10 by default)')
+    argParser.add_argument('--dtype', default='float32', choices=['float32', 'float64'],
+                           help='data type of terrain heights (float32 by default)')
+    argParser.add_argument('--output-format', default='asc', choices=['asc', 'npy', 'tif'],
+                           help="format of the merged DTM: 'asc', 'npy' (with *.json header) or 'tif' (tiled GeoTIFF) "
+                                "('asc' by default)")
+    argParser.add_argument('--tile-size', type=geoTiffTileSize, default=256,
+                           help="width and height of tiles of the 'tif' format, positive multiple of 16 (256 by default)")
+    argParser.add_argument('--overlap-rule', default='first', choices=['first', 'last', 'min', 'max', 'mean'],
+                           help="height kept in cells covered by more than one dataset ('first' by default)")
+    argParser.add_argument('--bbox', type=float, nargs=4, default=None, metavar=('XMIN', 'YMIN', 'XMAX', 'YMAX'),
+                           help='merge only the area within the bounding box (whole extent of datasets by default)')
+    argParser.add_argument('--incremental', action='store_true',
+                           help='update the merged DTM kept in the output catalog with added, changed and removed datasets')
+    argParser.add_argument('--overviews', type=int, nargs='+', default=None, metavar='FACTOR',
+                           help='reduction factors of overviews exported next to the merged DTM, e.g. 2 4 8 (no overviews '
+                                'by default)')
+    argParser.add_argument('--overview-rule', default='mean', choices=['mean', 'min', 'max'],
+                           help="reduction of blocks of cells of overviews ('mean' by default)")
+    argParser.add_argument('--target-cell-size', type=float, default=None,
+                           help='cell size of the merged DTM (the smallest cell size of datasets by default)')
+    argParser.add_argument('--target-origin', type=float, nargs=2, default=None, metavar=('X', 'Y'),
+                           help='coordinates of any node of the grid of the merged DTM (lower left cell of datasets by '
+                                'default)')
+    argParser.add_argument('--resampling', default='nearest', choices=['nearest', 'bilinear', 'average'],
+                           help="resampling of datasets not matching the grid of the merged DTM ('nearest' by default)")
+    argParser.add_argument('--report', action='store_true',
+                           help="write statistics of the merged DTM and heights, nodata coverage, overlap disagreement and "
+                                "seam discontinuities of datasets to '<output name>_report.json' in the output catalog")
+    argParser.add_argument('--quiet', action='store_true',
+                           help='do not print processing stages and datasets (only execution times)')
+    argParser.add_argument('--metrics', action='store_true',
+                           help="write duration, cells, bytes and peak memory of each stage and dataset to "
+                                "'<output name>_metrics.json' in the output catalog")
+    argParser.add_argument('--profile', default=None, choices=['cprofile', 'tracemalloc'],
+                           help='run a profiler around each processing stage (no profiler by default)')
+    argParser.add_argument('--strips', type=int, default=None, metavar='N',
+                           help='write jobs merging N horizontal strips of the merged DTM independently, instead of merging')
+    argParser.add_argument('--strip', type=int, default=None, metavar='K',
+                           help='merge strip K of the plan given with --plan (without any questions)')
+    argParser.add_argument('--concatenate', action='store_true',
+                           help='put merged strips of the plan given with --plan together and export the merged DTM')
+    argParser.add_argument('--plan', default=None,
+                           help="path to the plan of strip jobs - '<output name>_strips.json' written with --strips")
+    args = argParser.parse_args()
 
-while True:
-    # load all *.asc DTMs from input catalog and display the loading time in sec
-    start = time.time()
-    headers, dtms = merge.loadMultipleAscDtms()
-    print(f'Data loading - execution time: {round(time.time() - start, 1)} [s]\n')
+    if (args.strip is not None or args.concatenate) and args.plan is None:
+        argParser.error('--strip and --concatenate require --plan')
 
-    # calculate statistics of all datasets
-    statistics = merge.findStatisticsForDatasets(headers)
+    # run a strip job or concatenate merged strips - all of the options are taken from the plan
+    if args.strip is not None or args.concatenate:
+        merge, plan = loadStripPlan(args.plan, streaming=args.streaming, threads=args.threads, quiet=args.quiet,
+                                    profiler=args.profile, cacheCatalog=args.cache_catalog,
+                                    cacheSizeLimit=int(args.cache_size_limit * 1024 ** 3))
+        start = time.time()
 
-    # find spatial distribution of all datasets
-    numOfDatasetsAlongX, numOfDatasetsAlongY = merge.findSpatialDistributionOfDatasets(statistics)
+        if args.strip is not None:
+            stripPath = merge.runStripJob(os.path.join(os.path.dirname(os.path.abspath(args.plan)), plan['jobs'][args.strip]))
+            print(f'Merging strip #{args.strip} into {stripPath} - execution time: {round(time.time() - start, 1)} [s]\n')
+        else:
+            merge.concatenateStrips(args.plan)
+            print(f'Concatenating strips - execution time: {round(time.time() - start, 1)} [s]\n')
+
+        if args.metrics or args.profile is not None:
+            print(f'Metrics of processing stages and datasets written to {merge.writeMetrics()}\n')
 
-    # sort datasets in Y-descending and X-ascending order
-    sortedDatasets = merge.sortDatasets(headers, numOfDatasetsAlongX)
+        return
 
-    # find tiles with max X and Y coordinates
-    xMaxTile, yMaxTile = merge.findTilesWithMaxCoords(headers)
+    # print program name
+    columns = shutil.get_terminal_size().columns
+    print(os.path.basename(__file__).center(columns))
+    print('-' * columns)
 
-    # create final DTM array initially filled with 'nodata_values'
-    finalDtmArray = merge.createFinalArrayFilledWithNoDataValues(statistics, headers, xMaxTile, yMaxTile)
+    # specify paths to input and output catalogs
+    inputCatalog = askUserForPath('input')
+    outputCatalog = askUserForPath('output')
 
-    # fill the final DTM array with data from sorted datasets
-    start = time.time()
-    merge.fillFinalDtmArrayWithData(sortedDatasets, headers, statistics, dtms, finalDtmArray)
-    print(f'Merging DTMs - execution time: {round(time.time() - start, 1)} [s]\n')
+    # specify header options:
+    headerOptions = {
+        1 : ['ncols', 'nrows', 'xllcenter', 'yllcenter', 'cellsize', 'nodata_value'],
+        2 : ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value']
+    }
 
-    # create header to be used in output file
-    finalHeader = merge.constructFinalHeader(finalDtmArray, statistics)
+    # ask user for header components
+    headerComponents = askUserForHeaderComponents(headerOptions)
+
+    # initialize MergeAscDtms() class
+    merge = MergeAscDtms(inputCatalog, outputCatalog, ' ', f'merged_dtm.{args.output_format}', headerComponents,
+                         workers=args.workers, streaming=args.streaming, precision=args.precision,
+                         cacheCatalog=args.cache_catalog, cacheSizeLimit=int(args.cache_size_limit * 1024 ** 3),
+                         dtype=args.dtype, tileSize=args.tile_size, overlapRule=args.overlap_rule, threads=args.threads,
+                         quiet=args.quiet, profiler=args.profile, overviewLevels=args.overviews,
+                         overviewRule=args.overview_rule, targetCellSize=args.target_cell_size,
+                         targetOrigin=args.target_origin, resampling=args.resampling, report=args.report)
 
-    # export created header and DTM array as *.asc file
-    start = time.time()
-    merge.exportFinalDtmAsAscFile(finalHeader, finalDtmArray)
-    print(f'Exporting DTM - execution time: {round(time.time() - start, 1)} [s]\n')
 
-    # ask if user want to merge another set of DTMs or just to exit the program
     while True:
-        answer = input("Would You like to merge another set of DTMs [y] or just quit the program [n]?\n")
+        merge.resetMetrics()
 
-        if answer == 'y' or answer == 'Y':
-            break
+        if args.incremental:
+            # re-merge only the windows of datasets added, changed or removed since the previous run
+            start = time.time()
+            changes = merge.mergeIncrementally()
+            print(f"Added: {len(changes['added'])}, changed: {len(changes['changed'])}, "
+                  f"removed: {len(changes['removed'])} datasets (full merge: {changes['full merge']})")
+            print(f'Incremental merging DTMs - execution time: {round(time.time() - start, 1)} [s]\n')
 
-        elif answer == 'n' or answer == 'N':
-            break
+        elif args.strips is not None:
+            # write strip jobs, which can be run in separate processes or on separate machines
+            planPath = merge.createStripJobs(args.strips)
+
+            with open(planPath, 'r') as f:
+                numOfStrips = len(json.load(f)['jobs'])
+
+            print(f'Plan of {numOfStrips} strip jobs written to {planPath} - merge each strip with:')
+            print(f'\tpython -m merge_multiple_asc_dtms --strip K --plan "{planPath}"    (K = 0...{numOfStrips - 1})')
+            print('and put merged strips together with:')
+            print(f'\tpython -m merge_multiple_asc_dtms --concatenate --plan "{planPath}"\n')
+
+        elif args.bbox is not None:
+            # merge only the datasets intersecting the bounding box (only their rows inside it are read)
+            start = time.time()
+            finalHeader, finalDtmArray = merge.merge(bbox=tuple(args.bbox))
+            print(f'Merging DTMs within the bounding box - execution time: {round(time.time() - start, 1)} [s]\n')
 
         else:
-            print('Incorrect answer. Try again...\n')
+            # load all *.asc DTMs from input catalog and display the loading time in sec
+            start = time.time()
+            headers, dtms = merge.loadMultipleAscDtms()
+            print(f'Data loading - execution time: {round(time.time() - start, 1)} [s]\n')
+
+            # calculate statistics of all datasets
+            statistics = merge.findStatisticsForDatasets(headers)
+
+            # find spatial distribution of all datasets
+            numOfDatasetsAlongX, numOfDatasetsAlongY = merge.findSpatialDistributionOfDatasets(statistics)
+
+            # sort datasets in Y-descending and X-ascending order
+            sortedDatasets = merge.sortDatasets(headers, numOfDatasetsAlongX)
+
+            # find tiles with max X and Y coordinates
+            xMaxTile, yMaxTile = merge.findTilesWithMaxCoords(headers)
+
+            # create final DTM array initially filled with 'nodata_values'
+            finalDtmArray = merge.createFinalArrayFilledWithNoDataValues(statistics, headers, xMaxTile, yMaxTile)
+
+            # fill the final DTM array with data from sorted datasets
+            start = time.time()
+            merge.fillFinalDtmArrayWithData(sortedDatasets, headers, statistics, dtms, finalDtmArray)
+            mergingTime = time.time() - start
+            mergedCells = sum(h[headerComponents[0]] * h[headerComponents[1]] for h in headers.values())
+            print(f'Merging DTMs - execution time: {round(mergingTime, 1)} [s] '
+                  f'({int(mergedCells / max(mergingTime, 1e-6))} cells/s)\n')
+
+            # create header to be used in output file
+            finalHeader = merge.constructFinalHeader(finalDtmArray, statistics)
+
+            # export created header and DTM array as *.asc (or *.npy/*.tif) file
+            start = time.time()
+            merge.exportFinalDtm(finalHeader, finalDtmArray)
+            print(f'Exporting DTM - execution time: {round(time.time() - start, 1)} [s]\n')
+
+            # export overviews of the final DTM (reduced in a single pass over the final DTM array)
+            if args.overviews:
+                start = time.time()
+                merge.exportOverviews(finalDtmArray, statistics)
+                print(f'Exporting overviews - execution time: {round(time.time() - start, 1)} [s]\n')
+
+            # export the report of the final DTM and of datasets (collected while they were merged)
+            if args.report:
+                start = time.time()
+                reportPath = merge.exportReport(finalDtmArray, statistics)
+                print(f'Exporting report to {reportPath} - execution time: {round(time.time() - start, 1)} [s]\n')
+
+        # write metrics of processing stages and datasets
+        if args.metrics or args.profile is not None:
+            print(f'Metrics of processing stages and datasets written to {merge.writeMetrics()}\n')
+
+        # remove the memory-mapped final DTM array used in streaming mode
+        if args.streaming and not args.incremental and args.strips is None:
+            mosaicPath = finalDtmArray.filename
+            del finalDtmArray
+            os.remove(mosaicPath)
+
+        # ask if user want to merge another set of DTMs or just to exit the program
+        while True:
+            answer = input("Would You like to merge another set of DTMs [y] or just quit the program [n]?\n")
+
+            if answer == 'y' or answer == 'Y':
+                break
+
+            elif answer == 'n' or answer == 'N':
+                break
+
+            else:
+                print('Incorrect answer. Try again...\n')
+                continue
+
+        if answer == 'y' or answer == 'Y':
+            print('\n')
             continue
 
-    if answer == 'y' or answer == 'Y':
-        print('\n')
-        continue
+        elif answer =='n' or answer == 'N':
+            print('\n')
+            break
+
+    # press any key to exit:
+    input('Press any key to exit...')
 
-    elif answer =='n' or answer == 'N':
-        print('\n')
-        break
 
-# press any key to exit:
-input('Press any key to exit...')
\ No newline at end of file
+if __name__ == '__main__':
+    main()
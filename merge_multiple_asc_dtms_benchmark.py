@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# import necessary modules
+import numpy as np
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import json
+import time
+import os
+from merge_multiple_asc_dtms_fncts import MergeAscDtms
+
+
+# header structures of *.asc files - the same options, which are offered by merge_multiple_asc_dtms.py
+headerOptions = {
+    1 : ['ncols', 'nrows', 'xllcenter', 'yllcenter', 'cellsize', 'nodata_value'],
+    2 : ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value']
+}
+
+
+def generateSyntheticTiles(catalog, tilesAlongX = 4, tilesAlongY = 4, tileSize = 500, cellSize = 1, overlap = 0,
+                           gapFraction = 0., noDataFraction = 0.05, headerOption = 2, noData = -9999, seed = 0):
+    """
+    Writes a grid of synthetic *.asc DTM tiles, which are sampling one continuous terrain surface (so that overlapping
+    tiles are storing the same heights).
+
+    Args:
+        catalog - String - path to the catalog, which the tiles are going to be written to (created if it does not exist)
+        tilesAlongX, tilesAlongY - ints - number of tiles along X and Y axis (4 by default)
+        tileSize - int - number of columns and rows of each tile (500 by default)
+        cellSize - int/float - cell size of tiles (1 by default)
+        overlap - int - number of columns/rows shared by neighbouring tiles (0 by default)
+        gapFraction - float - fraction of tiles, which are randomly left out of the grid (0. by default)
+        noDataFraction - float - fraction of cells of each tile set to nodata_value (0.05 by default)
+        headerOption - int - key of headerOptions, specifying the header structure of tiles (2 by default)
+        noData - int - nodata_value of tiles (-9999 by default)
+        seed - int - seed of the random number generator (0 by default)
+    Returns:
+        tileNames - list of Strings - names of the written *.asc files
+    """
+    os.makedirs(catalog, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    headerComponents = headerOptions[headerOption]
+    step = tileSize - overlap
+
+    tiles = [(i, j) for j in range(tilesAlongY) for i in range(tilesAlongX)]
+    skipped = set()
+
+    if gapFraction > 0:
+        numOfGaps = min(int(round(gapFraction * len(tiles))), len(tiles) - 1)
+        skipped = {tiles[k] for k in rng.choice(len(tiles), numOfGaps, replace=False)}
+
+    tileNames = []
+
+    for i, j in tiles:
+
+        if (i, j) in skipped:
+            continue
+
+        # columns/rows of the tile in the grid of the whole synthetic terrain (rows are counted from the bottom)
+        cols = np.arange(i * step, i * step + tileSize)
+        rows = np.arange(j * step + tileSize - 1, j * step - 1, -1)
+
+        heights = 200. + 50. * np.sin(cols[np.newaxis, :] / 150.) * np.cos(rows[:, np.newaxis] / 210.) + \
+                  0.01 * (cols[np.newaxis, :] % 97 + rows[:, np.newaxis] % 89)
+        heights = np.round(heights, 2)
+        heights[rng.random(heights.shape) < noDataFraction] = noData
+
+        xll, yll = 500000 + i * step * cellSize, 250000 + j * step * cellSize
+
+        if 'center' in headerComponents[2]:
+            xll, yll = xll + cellSize / 2, yll + cellSize / 2
+
+        tileName = f'tile_{j:03d}_{i:03d}.asc'
+
+        with open(os.path.join(catalog, tileName), 'w') as f:
+
+            for component, value in zip(headerComponents, [tileSize, tileSize, xll, yll, cellSize, noData]):
+                f.write(f'{component} {value}\n')
+
+            np.savetxt(f, heights, fmt='%.2f')
+
+        tileNames.append(tileName)
+
+    return tileNames
+
+
+def benchmarkMergeStages(merge):
+    """
+    Runs the whole merging pipeline once and measures each of its stages. Memory of each stage is traced with
+    tracemalloc (allocations of Python objects and NumPy arrays in the main process - memory-mapped files and worker
+    processes are not included), relative to the memory traced when the stage starts.
+
+    Args:
+        merge - MergeAscDtms() instance (preferably with quiet=True)
+    Returns:
+        stages - dictionary with stage names ('load', 'stats', 'sort', 'allocate', 'fill', 'export') as keys and
+            dictionaries with 'seconds', 'cells', 'cells per second', 'peak memory' (max bytes allocated during the stage)
+            and 'retained memory' (bytes still allocated when the stage ends) as values - in streaming mode the 'load'
+            stage reads only headers ('measures' key), so it has no cells, and terrain heights are loaded in 'fill'
+    """
+    stages = {}
+
+    def measure(stageName, cells, function, *args):
+        tracemalloc.reset_peak()
+        tracedAtStart = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+
+        traced, tracedPeak = tracemalloc.get_traced_memory()
+
+        stages[stageName] = {
+            'seconds': seconds,
+            'cells': cells,
+            'cells per second': cells / seconds if seconds > 0 else None,
+            'peak memory': tracedPeak - tracedAtStart,
+            'retained memory': traced - tracedAtStart
+        }
+
+        return result
+
+    def statsStage(headers):
+        statistics = merge.findStatisticsForDatasets(headers)
+        return statistics, merge.findSpatialDistributionOfDatasets(statistics)
+
+    def sortStage(headers, numOfDatasetsAlongX):
+        return merge.sortDatasets(headers, numOfDatasetsAlongX), merge.findTilesWithMaxCoords(headers)
+
+    def exportStage(finalDtmArray, statistics):
+        merge.exportFinalDtm(merge.constructFinalHeader(finalDtmArray, statistics), finalDtmArray)
+
+    tracing = tracemalloc.is_tracing()
+
+    if not tracing:
+        tracemalloc.start()
+
+    try:
+        # cells of the input tiles are counted after loading - the load stage is updated below
+        headers, dtms = measure('load', 0, merge.loadMultipleAscDtms)
+        tileCells = sum(h[merge.headerComponents[0]] * h[merge.headerComponents[1]] for h in headers.values())
+
+        # only headers are read up front in streaming mode - terrain heights are loaded in the fill stage
+        stages['load']['measures'] = 'headers' if merge.streaming else 'datasets'
+
+        if merge.streaming:
+            stages['load']['cells per second'] = None
+        else:
+            stages['load']['cells'] = tileCells
+            stages['load']['cells per second'] = tileCells / stages['load']['seconds'] if stages['load']['seconds'] > 0 \
+                else None
+
+        statistics, (numOfDatasetsAlongX, numOfDatasetsAlongY) = measure('stats', tileCells, statsStage, headers)
+        sortedDatasets, (xMaxTile, yMaxTile) = measure('sort', tileCells, sortStage, headers, numOfDatasetsAlongX)
+
+        shape = merge.findFinalDtmArrayShape(statistics, headers, xMaxTile, yMaxTile)
+        finalDtmArray = measure('allocate', shape[0] * shape[1], merge.createFinalArrayFilledWithNoDataValues, statistics,
+                                headers, xMaxTile, yMaxTile)
+
+        measure('fill', tileCells, merge.fillFinalDtmArrayWithData, sortedDatasets, headers, statistics, dtms,
+                finalDtmArray)
+        measure('export', finalDtmArray.size, exportStage, finalDtmArray, statistics)
+
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return stages
+
+
+def runBenchmark(inputCatalog, outputCatalog, headerOption = 2, repeats = 1, **mergeOptions):
+    """
+    Args:
+        inputCatalog - String - path to the catalog with *.asc DTM tiles
+        outputCatalog - String - path to the catalog, which the merged DTM is going to be written to
+        headerOption - int - key of headerOptions, specifying the header structure of tiles (2 by default)
+        repeats - int - number of runs of the whole pipeline (1 by default)
+        mergeOptions - keyword arguments passed to MergeAscDtms()
+    Returns:
+        results - dictionary with the environment, options and stage measurements of each run (JSON serializable)
+    """
+    runs = []
+
+    for _ in range(repeats):
+        merge = MergeAscDtms(inputCatalog, outputCatalog, headerComponents=headerOptions[headerOption], quiet=True,
+                             **mergeOptions)
+
+        runs.append(benchmarkMergeStages(merge))
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu count': os.cpu_count()
+        },
+        'input catalog': os.path.abspath(inputCatalog),
+        'header option': headerOption,
+        'merge options': {k: str(v) for k, v in mergeOptions.items()},
+        'runs': runs,
+        'best seconds': {stage: min(run[stage]['seconds'] for run in runs) for stage in runs[0]}
+    }
+
+
+def main():
+    argParser = argparse.ArgumentParser(description='Benchmark of the *.asc DTMs merging pipeline on synthetic tiles.')
+    argParser.add_argument('--input-catalog', default=None,
+                           help='catalog with *.asc tiles - synthetic tiles are generated into it if it is empty or does '
+                                'not exist (temporary catalog by default)')
+    argParser.add_argument('--tiles-x', type=int, default=4, help='number of synthetic tiles along X axis (4 by default)')
+    argParser.add_argument('--tiles-y', type=int, default=4, help='number of synthetic tiles along Y axis (4 by default)')
+    argParser.add_argument('--tile-size', type=int, default=500, help='columns/rows of synthetic tiles (500 by default)')
+    argParser.add_argument('--overlap', type=int, default=0, help='columns/rows shared by neighbouring tiles (0 by default)')
+    argParser.add_argument('--gaps', type=float, default=0., help='fraction of missing tiles (0 by default)')
+    argParser.add_argument('--nodata', type=float, default=0.05, help='fraction of nodata cells (0.05 by default)')
+    argParser.add_argument('--header-option', type=int, default=2, choices=sorted(headerOptions),
+                           help='header structure of tiles (2 by default)')
+    argParser.add_argument('--repeats', type=int, default=1, help='number of runs of the pipeline (1 by default)')
+    argParser.add_argument('--workers', type=int, default=1, help='processes used for loading datasets (1 by default)')
+    argParser.add_argument('--threads', type=int, default=1, help='threads used for merging datasets (1 by default)')
+    argParser.add_argument('--streaming', action='store_true', help='merge in streaming mode')
+    argParser.add_argument('--dtype', default='float32', help='data type of terrain heights (float32 by default)')
+    argParser.add_argument('--output-format', default='asc', choices=sorted(MergeAscDtms.outputWriters),
+                           help="format of the merged DTM ('asc' by default)")
+    argParser.add_argument('--overlap-rule', default='first', help="overlap rule of merging ('first' by default)")
+    argParser.add_argument('--output', default=None, help='path to the JSON file with results (stdout by default)')
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='merge_asc_dtms_benchmark_') as tmpCatalog:
+
+        inputCatalog = args.input_catalog or os.path.join(tmpCatalog, 'input')
+        outputCatalog = os.path.join(tmpCatalog, 'output')
+        os.makedirs(outputCatalog)
+
+        if not (os.path.isdir(inputCatalog) and os.listdir(inputCatalog)):
+            generateSyntheticTiles(inputCatalog, args.tiles_x, args.tiles_y, args.tile_size, overlap=args.overlap,
+                                   gapFraction=args.gaps, noDataFraction=args.nodata, headerOption=args.header_option)
+
+        results = runBenchmark(inputCatalog, outputCatalog, args.header_option, args.repeats, workers=args.workers,
+                               threads=args.threads, streaming=args.streaming, dtype=args.dtype,
+                               overlapRule=args.overlap_rule,
+                               outputFileName=f'merged_dtm.{args.output_format}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,307 @@
 
 # import necessary modules
 from operator import itemgetter
+from itertools import islice, groupby
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Mapping
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
+from functools import wraps
 from math import *
 import numpy as np
+import tracemalloc
+import zipfile
+import gzip
+import lzma
+import bz2
+import io
+import threading
+import tempfile
+import cProfile
+import hashlib
+import json
+import struct
+import zlib
 import time
+import sys
 import os
 
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# fields of the tile index built by MergeAscDtms.scanHeaders() ('name' and 'path' widths depend on the datasets)
+TILE_INDEX_FIELDS = [('name', 'U'), ('path', 'U'), ('xll', 'f8'), ('yll', 'f8'), ('ncols', 'i8'), ('nrows', 'i8'),
+                     ('cellsize', 'f8'), ('nodata', 'f8')]
+
+
+# rules of resolving cells covered by more than one dataset (see MergeAscDtms.resolveOverlap())
+OVERLAP_RULES = ('first', 'last', 'min', 'max', 'mean')
+
+
+# rules of reducing blocks of cells of overview levels (see MergeAscDtms.reduceBlocks())
+OVERVIEW_RULES = ('mean', 'min', 'max')
+
+
+# methods of resampling datasets, which are not aligned with the target grid (see MergeAscDtms.resampleTileToGrid())
+RESAMPLING_METHODS = ('nearest', 'bilinear', 'average')
+
+
+# tolerance of matching datasets' cell sizes and offsets with the target grid, as a fraction of a cell
+ALIGNMENT_TOLERANCE = 1e-6
+
+
+# extensions of input datasets - plain *.asc files, compressed ones, and *.asc members of *.zip archives in the input
+# catalog are loaded (see openAscFile())
+ASC_EXTENSIONS = ('.asc', '.asc.gz', '.asc.bz2', '.asc.xz')
+
+
+# functions opening compressed *.asc files in text mode, with streaming decompression
+COMPRESSED_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+# *.zip archives kept open by the current pass over datasets (see keepZipArchivesOpen()), so that the central directory of
+# an archive is read once per pass, not once per member - None, if no pass is keeping archives open
+openZipArchives = None
+
+
+# profilers, which can be run around processing stages (see MergeAscDtms.measureStage())
+PROFILERS = ('cprofile', 'tracemalloc')
+
+
+def isAscFile(fileName):
+    """
+    Args:
+        fileName - String - name of a file or of a member of a *.zip archive
+    Returns:
+        isAsc - bool - True for names ending with one of ASC_EXTENSIONS
+    """
+    return fileName.lower().endswith(ASC_EXTENSIONS)
+
+
+def splitZipMemberPath(path):
+    """
+    Args:
+        path - String - path to a file or to a member of a *.zip archive ('<path to archive>.zip/<member>')
+    Returns:
+        zipPath - String - path to the *.zip archive (or the path itself, if it is not pointing to a member)
+        member - String - name of the member in the archive (None for paths of files)
+    """
+    lowerPath = path.lower()
+
+    for separator in ('/', '\\'):
+        index = lowerPath.find('.zip' + separator)
+
+        if index != -1 and os.path.isfile(path[:index + 4]):
+            return path[:index + 4], path[index + 5:].replace('\\', '/')
+
+    return path, None
+
+
+class OpenZipArchives():
+
+
+    def __init__(self):
+        """
+        *.zip archives, which are opened on first use and kept open until close() is called - by their paths. Archives
+        are shared by threads, but not by processes (each process has its own file positions to keep).
+        """
+        self.pid = os.getpid()
+        self.archives = {}
+        self.lock = threading.Lock()
+
+
+    @contextmanager
+    def findArchive(self, zipPath):
+        """
+        Args:
+            zipPath - String - path to a *.zip archive
+        Yields:
+            archive - zipfile.ZipFile() - the open archive (members are opened by one thread at a time)
+        """
+        with self.lock:
+            archive = self.archives.get(zipPath)
+
+            if archive is None:
+                archive = self.archives[zipPath] = zipfile.ZipFile(zipPath)
+
+            yield archive
+
+
+    def close(self):
+        with self.lock:
+            for archive in self.archives.values():
+                archive.close()
+
+            self.archives = {}
+
+
+def keepZipArchivesOpen():
+    """
+    Makes the calling process keep *.zip archives open from now on - used as the initializer of worker processes, which
+    are loading datasets (archives are closed when the worker exits).
+
+    Returns:
+        archives - OpenZipArchives() instance, which was started by this call (None, if archives were already kept open)
+    """
+    global openZipArchives
+
+    if openZipArchives is not None and openZipArchives.pid == os.getpid():
+        return None
+
+    openZipArchives = OpenZipArchives()
+
+    return openZipArchives
+
+
+def keepingZipArchivesOpen(method):
+    """
+    Decorator of MergeAscDtms() methods, which are passes over datasets - *.zip archives opened during the pass are kept
+    open until it ends (nested passes share the archives of the outermost one).
+    """
+    @wraps(method)
+    def methodKeepingZipArchivesOpen(self, *args, **kwargs):
+        global openZipArchives
+
+        archives = keepZipArchivesOpen()
+
+        try:
+            return method(self, *args, **kwargs)
+
+        finally:
+            if archives is not None:
+                openZipArchives = None
+                archives.close()
+
+    return methodKeepingZipArchivesOpen
+
+
+@contextmanager
+def findZipArchive(zipPath):
+    """
+    Args:
+        zipPath - String - path to a *.zip archive
+    Yields:
+        archive - zipfile.ZipFile() - the archive kept open by the current pass (see keepZipArchivesOpen()), or the one
+            opened just for the caller (closed afterwards), if no pass of this process is keeping archives open
+    """
+    archives = openZipArchives
+
+    if archives is not None and archives.pid == os.getpid():
+        with archives.findArchive(zipPath) as archive:
+            yield archive
+
+    else:
+        with zipfile.ZipFile(zipPath) as archive:
+            yield archive
+
+
+def openAscFile(path):
+    """
+    Opens an *.asc file in text mode - *.gz, *.bz2 and *.xz files and members of *.zip archives are decompressed on the
+    fly, while they are being read (only the lines which are read are decompressed).
+
+    Args:
+        path - String - path to an *.asc file (see ASC_EXTENSIONS) or to an *.asc member of a *.zip archive
+    Returns:
+        f - text file object
+    """
+    zipPath, member = splitZipMemberPath(path)
+
+    if member is not None:
+        # the member keeps the archive's file open after the archive is closed
+        with findZipArchive(zipPath) as archive:
+            return io.TextIOWrapper(archive.open(member))
+
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+
+    return opener(path, 'rt') if opener is not None else open(path, 'r')
+
+
+def openRawAscFile(path):
+    """
+    Args:
+        path - String - path to an *.asc file (see ASC_EXTENSIONS) or to an *.asc member of a *.zip archive
+    Returns:
+        f - binary file object - bytes of the file as they are stored (decompressed bytes of members of *.zip archives)
+    """
+    zipPath, member = splitZipMemberPath(path)
+
+    if member is not None:
+        with findZipArchive(zipPath) as archive:
+            return archive.open(member)
+
+    return open(path, 'rb')
+
+
+def statAscFile(path):
+    """
+    Args:
+        path - String - path to an *.asc file (see ASC_EXTENSIONS) or to an *.asc member of a *.zip archive
+    Returns:
+        size - int - size of the file in bytes (compressed size of members of *.zip archives)
+        mtimeNs - int - modification time of the file (of the archive for its members) in nanoseconds
+    """
+    zipPath, member = splitZipMemberPath(path)
+    stat = os.stat(zipPath)
+
+    if member is not None:
+        with findZipArchive(zipPath) as archive:
+            return archive.getinfo(member).compress_size, stat.st_mtime_ns
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+def findPeakRss():
+    """
+    Returns:
+        peakRss - dictionary - peak resident set size of this process and of its finished child processes in bytes
+            (None values, if the 'resource' module is not available, e.g. on Windows)
+    """
+    if resource is None:
+        return {'self': None, 'children': None}
+
+    # ru_maxrss is given in bytes on macOS and in kilobytes elsewhere
+    unit = 1 if sys.platform == 'darwin' else 1024
+
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    }
+
+
+def measuredStage(stageName):
+    """
+    Decorator of MergeAscDtms() methods, which are processing stages - each call is measured with measureStage().
+
+    Args:
+        stageName - String - name of the stage in MergeAscDtms().metrics['stages']
+    """
+    def decorator(method):
+
+        @wraps(method)
+        def measuredMethod(self, *args, **kwargs):
+            with self.measureStage(stageName):
+                return method(self, *args, **kwargs)
+
+        return measuredMethod
+
+    return decorator
+
+
+def asPythonNumber(value):
+    """
+    Args:
+        value - number (also NumPy scalar)
+    Returns:
+        int, if the value is integral, float otherwise (the same types, which are obtained while parsing *.asc headers)
+    """
+    value = float(value)
+
+    return int(value) if value.is_integer() else value
+
 
 def askUserForPath(inOrOut='input'):
     """
@@ -75,341 +371,3244 @@ def askUserForHeaderComponents(headerOptions):
     return headerOptions[answer]
 
 
-class MergeAscDtms():
+# MergeAscDtms() instance of a worker process loading datasets (see startLoadingWorker())
+loadingWorker = None
+
+
+def startLoadingWorker(merge):
+    """
+    Initializer of worker processes loading datasets - the MergeAscDtms() instance is passed to each worker once, so that
+    tasks pass only paths (see loadAscDtmToNpyFile() and loadAscDtmToCache()).
+
+    Args:
+        merge - MergeAscDtms() instance used for loading datasets
+    """
+    global loadingWorker
+
+    keepZipArchivesOpen()
+    loadingWorker = merge
+
+
+def loadAscDtmToNpyFile(path, npyPath):
+    """
+    Args:
+        path - String, which is specifying the full file path to the *.asc DTM file
+        npyPath - String - full path to the *.npy file, which the terrain heights are going to be parsed into
+    Returns:
+        header, loadRecord - see MergeAscDtms.loadSingleAscDtmToNpyFile()
+    """
+    return loadingWorker.loadSingleAscDtmToNpyFile(path, npyPath)
+
+
+def loadAscDtmToCache(path):
+    """
+    Args:
+        path - String, which is specifying the full file path to the *.asc DTM file
+    Returns:
+        header - dictionary filled with informations stored in a header part of an input *.asc DTM file (terrain heights
+            are saved to the cache of the worker's MergeAscDtms() instance)
+    """
+    return loadingWorker.loadSingleAscDtm(path)[0]
+
+
+def loadStripPlan(planPath, **options):
+    """
+    Args:
+        planPath - String - path to the plan of strip jobs, written by MergeAscDtms.createStripJobs()
+        options - keyword arguments passed to MergeAscDtms() - overriding the options stored in the plan (e.g. threads,
+            quiet)
+    Returns:
+        merge - MergeAscDtms() instance with the options of the plan and the plan's catalog as the output catalog
+        plan - dictionary - the plan of strip jobs
+    """
+    with open(planPath, 'r') as f:
+        plan = json.load(f)
+
+    mergeOptions = dict(plan['merge options'], **options)
+    merge = MergeAscDtms(plan['input catalog'], os.path.dirname(os.path.abspath(planPath)), **mergeOptions)
+
+    return merge, plan
+
+
+class DtmsLoadedOnDemand(Mapping):
+
+
+    def __init__(self, merge, paths):
+        """
+        Mapping of file names to 'dtm' np.arrays(), which are loaded from disk every time they are accessed and are not
+        kept in memory afterwards (used by MergeAscDtms() in streaming mode).
+
+        Args:
+            merge - MergeAscDtms() instance used for loading datasets
+            paths - dictionary with file names as keys and full file paths to *.asc DTM files as values
+        """
+        self.merge = merge
+        self.paths = paths
+
+
+    def __getitem__(self, key):
+        return self.merge.loadSingleAscDtm(self.paths[key])[1]
+
+
+    def __iter__(self):
+        return iter(self.paths)
+
+
+    def __len__(self):
+        return len(self.paths)
+
+
+class MergedStrips():
+
+
+    def __init__(self, stripPaths, windows, finalShape, dtype):
+        """
+        Read-only view of the final DTM array made of merged strips - rows are read from the memory-mapped strips when
+        they are sliced (e.g. one chunk of rows at a time by the output writers), so that the strips are not copied into
+        another file (used by MergeAscDtms.concatenateStrips()).
+
+        Args:
+            stripPaths - list of Strings - paths to *.npy strips written by MergeAscDtms.runStripJob()
+            windows - list - rowStart, rowEnd, colStart, colEnd window of each strip in the final DTM array (strips are
+                covering all of the columns)
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+            dtype - np.dtype() - data type of heights
+        """
+        self.strips = [(window[0], window[1], np.load(stripPath, mmap_mode='r'))
+                       for stripPath, window in sorted(zip(stripPaths, windows), key=lambda strip: strip[1][0])]
+        self.shape = tuple(finalShape)
+        self.dtype = np.dtype(dtype)
+        self.ndim = 2
+        self.size = self.shape[0] * self.shape[1]
+        self.nbytes = self.size * self.dtype.itemsize
+
+
+    def __getitem__(self, rows):
+        """
+        Args:
+            rows - slice - rows of the final DTM array (with step 1)
+        Returns:
+            dtmRows - np.array() storing the rows
+        """
+        if not isinstance(rows, slice) or rows.step not in (None, 1):
+            raise TypeError('Merged strips can be sliced by rows only')
+
+        rowStart, rowEnd, _ = rows.indices(self.shape[0])
+
+        dtmRows = [strip[max(rowStart, stripRowStart) - stripRowStart:min(rowEnd, stripRowEnd) - stripRowStart]
+                   for stripRowStart, stripRowEnd, strip in self.strips
+                   if stripRowStart < rowEnd and rowStart < stripRowEnd]
+
+        if not dtmRows:
+            return np.empty((0, self.shape[1]), dtype=self.dtype)
+
+        return np.concatenate(dtmRows).astype(self.dtype, copy=False)
+
+
+    def __array__(self, dtype = None, copy = None):
+        return np.asarray(self[:], dtype=dtype)
+
+
+class DtmsCache():
+
+
+    def __init__(self, catalog, sizeLimit):
+        """
+        Persistent cache of parsed datasets - terrain heights are stored as *.npy files (loaded as read-only np.memmap())
+        and headers as *.json files. Entries are keyed by the absolute path, size and modification time of *.asc DTM
+        files, and the least recently used entries are removed when the size of the cache exceeds sizeLimit. Entries and
+        their sizes are listed from the catalog once and then kept up to date by load(), save() and evict() of this
+        instance (entries saved by other processes are counted after evict(rescan=True)).
+
+        Args:
+            catalog - String - path to the cache catalog (created if it does not exist)
+            sizeLimit - int - max size of the cache in bytes
+        """
+        os.makedirs(catalog, exist_ok=True)
+
+        self.catalog = catalog
+        self.sizeLimit = sizeLimit
+
+        # sizes of *.npy files of entries by their paths, from the least to the most recently used (None until listed)
+        self.entries = None
+        self.cacheSize = 0
+
+
+    def findEntryPaths(self, path, keyParams):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            keyParams - String - loading parameters, which are affecting the parsed dataset
+        Returns:
+            npyPath, jsonPath - Strings - paths to the cache entry files of the dataset
+        """
+        size, mtimeNs = statAscFile(path)
+        key = hashlib.sha1(f'{os.path.abspath(path)}|{size}|{mtimeNs}|{keyParams}'.encode()).hexdigest()
+
+        return os.path.join(self.catalog, key + '.npy'), os.path.join(self.catalog, key + '.json')
+
+
+    def load(self, path, keyParams):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            keyParams - String - loading parameters, which are affecting the parsed dataset
+        Returns:
+            (header, dtm) tuple of the cached dataset (dtm as read-only np.memmap()) or None, if it is not cached
+        """
+        npyPath, jsonPath = self.findEntryPaths(path, keyParams)
+
+        try:
+            with open(jsonPath, 'r') as f:
+                header = json.load(f)['header']
+            dtm = np.load(npyPath, mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # modification time of the *.npy file marks the last use of the entry
+        os.utime(npyPath)
+
+        if self.entries is not None and npyPath in self.entries:
+            self.entries.move_to_end(npyPath)
+
+        return header, dtm
+
+
+    def save(self, path, keyParams, header, dtm):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            keyParams - String - loading parameters, which are affecting the parsed dataset
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            dtm - np.array() with a (nrows, ncols) shape, storing terrain heights
+        """
+        npyPath, jsonPath = self.findEntryPaths(path, keyParams)
+
+        # entries are written under temporary names first, so that parallel workers never read a partial entry
+        tmpSuffix = f'.{os.getpid()}.tmp'
+
+        with open(npyPath + tmpSuffix, 'wb') as f:
+            np.save(f, dtm)
+        with open(jsonPath + tmpSuffix, 'w') as f:
+            json.dump({'path': os.path.abspath(path), 'header': header}, f)
+
+        os.replace(npyPath + tmpSuffix, npyPath)
+        os.replace(jsonPath + tmpSuffix, jsonPath)
+
+        if self.entries is None:
+            self.listEntries()
+        else:
+            size = os.path.getsize(npyPath)
+            self.cacheSize += size - self.entries.pop(npyPath, 0)
+            self.entries[npyPath] = size
+
+        self.evict()
+
+
+    def listEntries(self):
+        """
+        Lists entries of the cache catalog from the least to the most recently used, together with their total size.
+        """
+        entries = []
+
+        for entry in os.scandir(self.catalog):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        self.entries = OrderedDict((npyPath, size) for _, size, npyPath in sorted(entries))
+        self.cacheSize = sum(self.entries.values())
+
+
+    def evict(self, rescan = False):
+        """
+        Removes the least recently used entries, until the size of the cache is not greater than sizeLimit.
+
+        Args:
+            rescan - bool - list entries of the cache catalog again before evicting, e.g. after other processes saved
+                entries (False by default)
+        """
+        if self.entries is None or rescan:
+            self.listEntries()
+
+        while self.cacheSize > self.sizeLimit and self.entries:
+            npyPath, size = self.entries.popitem(last=False)
+
+            for entryPath in (npyPath, npyPath[:-len('.npy')] + '.json'):
+                try:
+                    os.remove(entryPath)
+                except OSError:
+                    pass
+
+            self.cacheSize -= size
+
+
+class TileGridIndex():
+
+
+    def __init__(self, windows, bucketSize = None):
+        """
+        Grid (bucket) index over windows of datasets in the final DTM array - each window is registered in all of the
+        buckets it covers, so that finding windows intersecting a given one needs to check only a few candidates.
+
+        Args:
+            windows - np.array() of ints with a (number of datasets, 4) shape - rowStart, rowEnd, colStart, colEnd window
+                of each dataset
+            bucketSize - int - size of square buckets in cells (None by default - median of the datasets' sizes)
+        """
+        self.windows = np.asarray(windows, dtype=np.int64).reshape(-1, 4)
+
+        if bucketSize is None:
+            sizes = np.maximum(self.windows[:, 1] - self.windows[:, 0], self.windows[:, 3] - self.windows[:, 2])
+            bucketSize = int(np.median(sizes)) if len(sizes) else 1
+
+        self.bucketSize = max(1, bucketSize)
+        self.buckets = defaultdict(list)
+
+        for position, window in enumerate(self.windows.tolist()):
+            for bucket in self.findBuckets(*window):
+                self.buckets[bucket].append(position)
+
+
+    def findBuckets(self, rowStart, rowEnd, colStart, colEnd):
+        """
+        Args:
+            rowStart, rowEnd, colStart, colEnd - ints - window in the final DTM array
+        Returns:
+            buckets - list of (bucket row, bucket column) tuples covered by the window
+        """
+        return [(bucketRow, bucketCol)
+                for bucketRow in range(rowStart // self.bucketSize, (max(rowEnd, rowStart + 1) - 1) // self.bucketSize + 1)
+                for bucketCol in range(colStart // self.bucketSize, (max(colEnd, colStart + 1) - 1) // self.bucketSize + 1)]
+
+
+    def query(self, rowStart, rowEnd, colStart, colEnd):
+        """
+        Args:
+            rowStart, rowEnd, colStart, colEnd - ints - window in the final DTM array
+        Returns:
+            positions - sorted list of positions of windows, which are sharing at least one cell with the given window
+        """
+        candidates = set()
+
+        for bucket in self.findBuckets(rowStart, rowEnd, colStart, colEnd):
+            candidates.update(self.buckets.get(bucket, ()))
+
+        return sorted(position for position in candidates
+                      if self.windows[position, 0] < rowEnd and rowStart < self.windows[position, 1] and
+                      self.windows[position, 2] < colEnd and colStart < self.windows[position, 3])
+
+
+    def findOverlappingPairs(self):
+        """
+        Returns:
+            pairs - sorted list of (position, position) tuples (smaller position first) of windows sharing cells
+        """
+        pairs = set()
+
+        for position, window in enumerate(self.windows.tolist()):
+            pairs.update((position, other) for other in self.query(*window) if other > position)
+
+        return sorted(pairs)
+
+
+    def findOverlappingTiles(self):
+        """
+        Returns:
+            overlapping - np.array() of bools - True for windows sharing cells with any other window
+        """
+        overlapping = np.zeros(len(self.windows), dtype=bool)
+
+        for position, other in self.findOverlappingPairs():
+            overlapping[position] = overlapping[other] = True
+
+        return overlapping
+
+
+    def findConflictFreeBatches(self, order):
+        """
+        Groups windows into batches of windows, which are not sharing any cells, so that windows of one batch can be
+        written at the same time. Each window is put into the batch following the last batch of the windows, which are
+        overlapping it and are earlier in order - so overlapping windows are still written in order.
+
+        Args:
+            order - list of ints - positions of windows in the order they have to be written in
+        Returns:
+            batches - list of lists of ints - positions of windows in each batch (in order)
+        """
+        batchOfPosition = {}
+        batches = []
+
+        for position in order:
+            earlierBatches = [batchOfPosition[other] for other in self.query(*self.windows[position].tolist())
+                              if other in batchOfPosition]
+            batch = max(earlierBatches, default=-1) + 1
+
+            if batch == len(batches):
+                batches.append([])
+
+            batches[batch].append(position)
+            batchOfPosition[position] = batch
+
+        return batches
+
+
+class MergeAscDtms():
+
+    # output formats and names of the methods writing them - extend it in subclasses to plug in other writers
+    outputWriters = {
+        'asc': 'exportFinalDtmAsAscFile',
+        'npy': 'exportFinalDtmAsNpyFile',
+        'tif': 'exportFinalDtmAsGeoTiffFile'
+    }
+
+
+    def __init__(self, inputCatalog, outputCatalog, dataSep = ' ', outputFileName = 'merged_dtm.asc',
+                 headerComponents = ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value'],
+                 parser = 'numpy', workers = 1, streaming = False, precision = None, floatFormat = None,
+                 writeBufferSize = 8 * 1024 * 1024, cacheCatalog = None, cacheSizeLimit = 10 * 1024 ** 3,
+                 dtype = 'float32', outputFormat = None, tileSize = 256, compressionLevel = 6, pauses = True,
+                 overlapRule = 'first', threads = 1, quiet = False, hooks = None, profiler = None,
+                 overviewLevels = None, overviewRule = 'mean', targetCellSize = None, targetOrigin = None,
+                 resampling = 'nearest', report = False):
+        """
+        Args:
+            dataSep - String - data separator to be used while loading and exporting datasets (' ' by default)
+            outputFileName - String - name of the output DTM - should contain '*.asc' extension ('merged_dtm.asc' by default)
+            parser - String - 'numpy' for bulk parsing of heights straight into a preallocated np.array() or 'python' for
+                the line by line parser ('numpy' by default)
+            workers - int - number of processes used for loading datasets in parallel (1 by default - no process pool)
+            streaming - bool - if True, only headers are loaded up front, datasets are read, placed and released one at
+                a time, and the final DTM array is memory-mapped to a *.npy file in the output catalog (False by default)
+            precision - int - number of decimal places of exported heights (None by default - heights are exported with
+                all of their digits)
+            floatFormat - String - printf-style format of exported heights, for example '%.3f' or '%g' - overrides
+                precision (None by default)
+            writeBufferSize - int - size of the output file buffer and of the chunks of text written at once, in bytes
+                (8 MB by default)
+            cacheCatalog - String - path to the catalog of the persistent cache of parsed datasets (None by default - no
+                cache)
+            cacheSizeLimit - int - max size of the cache in bytes - least recently used datasets are removed above it
+                (10 GB by default)
+            dtype - String or np.dtype() - data type of terrain heights used in loaded datasets, the final DTM array and
+                the export ('float32' by default)
+            outputFormat - String - format of the output DTM - one of the keys of outputWriters: 'asc', 'npy' (with *.json
+                header sidecar) or 'tif' (tiled, deflate-compressed GeoTIFF) (None by default - taken from the extension
+                of outputFileName)
+            tileSize - int - width and height of GeoTIFF tiles, positive multiple of 16 (256 by default)
+            compressionLevel - int - zlib compression level of GeoTIFF tiles (6 by default)
+            pauses - bool - if True, there is a short pause after each printed processing stage, so that the user can
+                follow the progress in the terminal (True by default)
+            overlapRule - String - resolution of cells covered by more than one dataset: 'first', 'last', 'min', 'max' or
+                'mean' (see resolveOverlap()) ('first' by default - datasets are taken in order of sortDatasets(), from
+                the bottom row up and from left to right)
+            threads - int - number of threads merging datasets, which are not sharing any cells, at the same time - cells
+                covered by more than one dataset are still resolved in the same order as with a single thread (1 by
+                default - no thread pool)
+            quiet - bool - if True, processing stages and datasets are not printed and there are no pauses (False by
+                default)
+            hooks - list of functions called with (event, name, record) arguments, every time a processing stage ('stage'
+                event) or a dataset ('tile' event) is measured - record is the dictionary added to metrics (see
+                measureStage() and recordTile()) - hooks may be called from threads merging datasets (None by default)
+            profiler - String - 'cprofile' (statistics dumped to '<output name>_<stage>.prof' in the output catalog) or
+                'tracemalloc' (top allocations and peak traced memory added to metrics) - run around every outermost
+                processing stage (None by default - no profiler)
+            overviewLevels - list of ints - reduction factors of overviews of the final DTM exported next to it, for
+                example [2, 4, 8] (see exportOverviews()) (None by default - no overviews)
+            overviewRule - String - reduction of each factor x factor block of cells of an overview: 'mean', 'min' or
+                'max' of the heights other than nodata_value ('mean' by default)
+            targetCellSize - int/float - cell size of the target grid of the final DTM (None by default - the smallest cell
+                size of datasets)
+            targetOrigin - tuple - (x, y) coordinates of any node of the target grid, in the convention of the header
+                (corner or center of a cell) - the grid's lower left cell is snapped to it (None by default - lower left
+                cell of the datasets)
+            resampling - String - 'nearest', 'bilinear' or 'average' - method of resampling datasets, which cell size or
+                offset is not matching the target grid (see resampleTileToGrid()) ('nearest' by default)
+            report - bool - if True, heights, nodata coverage, overlap disagreement and seam discontinuities of datasets
+                are collected while they are placed, and written with statistics of the final DTM to
+                '<output name>_report.json' in the output catalog (see exportReport()) (False by default)
+        """
+        if parser not in ('numpy', 'python'):
+            raise ValueError(f"Unknown parser '{parser}' - available parsers: 'numpy', 'python'")
+
+        self.inputCatalog = inputCatalog
+        self.outputCatalog = outputCatalog
+        self.dataSep = dataSep
+        self.outputFileName = outputFileName
+        self.headerComponents = headerComponents
+        self.parser = parser
+        self.workers = max(1, int(workers))
+        self.streaming = streaming
+        self.precision = precision
+        self.floatFormat = floatFormat
+        self.writeBufferSize = writeBufferSize
+        self.cache = DtmsCache(cacheCatalog, cacheSizeLimit) if cacheCatalog is not None else None
+        self.dtype = np.dtype(dtype)
+        self.outputFormat = outputFormat if outputFormat is not None else self.findOutputFormat(outputFileName)
+        self.tileSize = tileSize
+        self.compressionLevel = compressionLevel
+        self.pauses = pauses
+        self.overlapRule = overlapRule
+        self.threads = max(1, int(threads))
+        self.quiet = quiet
+        self.hooks = list(hooks) if hooks is not None else []
+        self.profiler = profiler
+        self.metricsLock = threading.Lock()
+        self.activeStages = []
+        self.resetMetrics()
+
+        self.overviewLevels = sorted(set(int(factor) for factor in overviewLevels)) if overviewLevels else []
+        self.overviewRule = overviewRule
+
+        self.targetCellSize = targetCellSize
+        self.targetOrigin = targetOrigin
+        self.resampling = resampling
+
+        self.report = report
+        self.resetReport()
+
+        if resampling not in RESAMPLING_METHODS:
+            raise ValueError(f"Unknown resampling method '{resampling}' - available methods: "
+                             f"{', '.join(RESAMPLING_METHODS)}")
+
+        if targetCellSize is not None and targetCellSize <= 0:
+            raise ValueError(f'Target cell size has to be greater than 0 - {targetCellSize} given')
+
+        if any(factor < 2 for factor in self.overviewLevels):
+            raise ValueError(f'Reduction factors of overviews have to be greater than 1 - {self.overviewLevels} given')
+
+        if overviewRule not in OVERVIEW_RULES:
+            raise ValueError(f"Unknown overview rule '{overviewRule}' - available rules: {', '.join(OVERVIEW_RULES)}")
+
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}' - available profilers: {', '.join(PROFILERS)}")
+
+        if overlapRule not in OVERLAP_RULES:
+            raise ValueError(f"Unknown overlap rule '{overlapRule}' - available rules: {', '.join(OVERLAP_RULES)}")
+
+        if not isinstance(tileSize, (int, np.integer)) or tileSize <= 0 or tileSize % 16:
+            raise ValueError(f'Size of GeoTIFF tiles has to be a positive multiple of 16 - {tileSize} given')
+
+        if self.outputFormat not in self.outputWriters:
+            raise ValueError(f"Unknown output format '{self.outputFormat}' - available formats: "
+                             f"{', '.join(self.outputWriters)}")
+
+
+    def __getstate__(self):
+        """
+        State passed to worker processes - without the lock, hooks and running stages (hooks are called only in the main
+        process, and metrics of worker processes are sent back with their results).
+        """
+        state = self.__dict__.copy()
+        del state['metricsLock']
+        state['hooks'] = []
+        state['activeStages'] = []
+        state['metrics'] = {'stages': {}, 'tiles': {}}
+
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.metricsLock = threading.Lock()
+
+
+    def pause(self):
+        """
+        Pauses the execution for a moment after a printed processing stage (if 'pauses' is True and 'quiet' is False).
+        """
+        if self.pauses and not self.quiet:
+            time.sleep(.5)
+
+
+    def log(self, message):
+        """
+        Prints a message about the progress of processing (if 'quiet' is False).
+
+        Args:
+            message - String - message to print
+        """
+        if not self.quiet:
+            print(message)
+
+
+    def resetMetrics(self):
+        """
+        Clears metrics - dictionary with 'stages' and 'tiles' dictionaries:
+            stages - stage names as keys and the records of the last run of each stage as values: 'seconds', 'cells
+                loaded', 'cells merged', 'cells written', 'bytes read', 'bytes written', 'peak rss' (peak resident set size
+                of the process so far) and 'peak traced memory' (only with 'tracemalloc' profiler)
+            tiles - dataset names as keys and dictionaries with operations ('load', 'merge') as keys and records with
+                'seconds', 'cells' and 'bytes read' as values
+        """
+        self.metrics = {'stages': {}, 'tiles': {}}
+
+
+    def resetReport(self):
+        """
+        Clears reportRecords - dictionary with dataset names as keys and records of the cells of each dataset placed so
+        far as values (see collectTileReport()).
+        """
+        self.reportRecords = {}
+
+
+    def callHooks(self, event, name, record):
+        """
+        Args:
+            event - String - 'stage' or 'tile'
+            name - String - name of the stage or of the dataset
+            record - dictionary - metrics of the stage or of the dataset
+        """
+        for hook in self.hooks:
+            hook(event, name, record)
+
+
+    @contextmanager
+    def measureStage(self, stageName):
+        """
+        Context manager measuring a processing stage - the record is stored in metrics['stages'] and passed to hooks at
+        the end of the stage. Counters of datasets (recordTile()) and of exported files are added to all of the stages
+        running at that moment. A stage already running (e.g. allocation within allocation) is not measured again.
+
+        Args:
+            stageName - String - name of the stage
+        """
+        if any(name == stageName for name, _ in self.activeStages):
+            yield
+            return
+
+        record = {'seconds': 0., 'cells loaded': 0, 'cells merged': 0, 'cells written': 0, 'bytes read': 0,
+                  'bytes written': 0, 'peak rss': None, 'peak traced memory': None}
+
+        outermost = not self.activeStages
+        profile = None
+        startedTracing = False
+
+        if outermost and self.profiler == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+
+        elif outermost and self.profiler == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            startedTracing = True
+
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        self.activeStages.append((stageName, record))
+        start = time.perf_counter()
+
+        try:
+            yield record
+
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.activeStages.pop()
+            record['peak rss'] = findPeakRss()['self']
+
+            if tracemalloc.is_tracing():
+                # peaks of inner stages were reset at their start, so they are kept in the records of outer stages
+                record['peak traced memory'] = max(record['peak traced memory'] or 0, tracemalloc.get_traced_memory()[1])
+
+                for _, outerRecord in self.activeStages:
+                    outerRecord['peak traced memory'] = max(outerRecord['peak traced memory'] or 0,
+                                                            record['peak traced memory'])
+
+            if profile is not None:
+                profile.disable()
+                record['profile'] = os.path.join(self.outputCatalog,
+                                                 f'{os.path.splitext(self.outputFileName)[0]}_{stageName}.prof')
+                profile.dump_stats(record['profile'])
+
+            if startedTracing:
+                record['top allocations'] = [str(stat) for stat in
+                                             tracemalloc.take_snapshot().statistics('lineno')[:10]]
+                tracemalloc.stop()
+
+            self.metrics['stages'][stageName] = record
+            self.callHooks('stage', stageName, record)
+
+
+    def addToActiveStages(self, **counters):
+        """
+        Args:
+            counters - keyword arguments - values added to counters of all of the running stages ('cellsLoaded',
+                'cellsMerged', 'cellsWritten', 'bytesRead', 'bytesWritten')
+        """
+        keys = {'cellsLoaded': 'cells loaded', 'cellsMerged': 'cells merged', 'cellsWritten': 'cells written',
+                'bytesRead': 'bytes read', 'bytesWritten': 'bytes written'}
+
+        with self.metricsLock:
+            for _, record in self.activeStages:
+                for counter, value in counters.items():
+                    record[keys[counter]] += int(value)
+
+
+    def recordTile(self, name, operation, seconds, cells, bytesRead = 0):
+        """
+        Stores metrics of loading or merging a single dataset and passes them to hooks.
+
+        Args:
+            name - String - name of the dataset (file name without extension)
+            operation - String - 'load' or 'merge'
+            seconds - float - duration of the operation
+            cells - int - number of cells loaded or merged
+            bytesRead - int - number of bytes read from disk (0 by default)
+        """
+        record = {'operation': operation, 'seconds': seconds, 'cells': int(cells), 'bytes read': int(bytesRead)}
+
+        with self.metricsLock:
+            self.metrics['tiles'].setdefault(name, {})[operation] = record
+
+        if operation == 'load':
+            self.addToActiveStages(cellsLoaded=cells, bytesRead=bytesRead)
+        else:
+            self.addToActiveStages(cellsMerged=cells, bytesRead=bytesRead)
+
+        self.callHooks('tile', name, record)
+
+
+    def writeMetrics(self, path = None):
+        """
+        Args:
+            path - String - path to the JSON file, which metrics are going to be written to (None by default -
+                '<output name>_metrics.json' in the output catalog)
+        Returns:
+            path - String - path to the written file
+        """
+        if path is None:
+            path = os.path.join(self.outputCatalog, f'{os.path.splitext(self.outputFileName)[0]}_metrics.json')
+
+        with open(path, 'w') as f:
+            json.dump(self.metrics, f, indent=4)
+
+        return path
+
+
+    def findDatasetName(self, path):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+        Returns:
+            name - String - name of the dataset (file name without extension), used as a key of headers and dtms
+        """
+        file = os.path.basename(path)
+
+        return file[:file.index('.')]
+
+
+    def loadSingleAscDtm(self, path):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            dtm - np.array() with a (nrows, ncols) shape and 'dtype' data type, storing terrain heights - read-only
+                np.memmap(), if the dataset was loaded from the cache
+        """
+        start = time.perf_counter()
+        cached = self.cache.load(path, self.findCacheKeyParams()) if self.cache is not None else None
+
+        if cached is not None:
+            header, dtm = cached
+            bytesRead = dtm.nbytes
+        else:
+            header, dtm = self.parseSingleAscDtm(path)
+            bytesRead = statAscFile(path)[0]
+
+            if self.cache is not None:
+                self.cache.save(path, self.findCacheKeyParams(), header, dtm)
+
+        self.recordTile(self.findDatasetName(path), 'load', time.perf_counter() - start, dtm.size, bytesRead)
+
+        return header, dtm
+
+
+    def findCacheKeyParams(self):
+        """
+        Returns:
+            cacheKeyParams - String - loading parameters, which are affecting the parsed datasets (a part of cache keys)
+        """
+        return f"{self.parser}|{self.dataSep!r}|{','.join(self.headerComponents)}|{self.dtype.str}"
+
+
+    def parseSingleAscDtm(self, path):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            dtm - np.array() with a (nrows, ncols) shape and 'dtype' data type, storing terrain heights
+        """
+        if self.parser == 'numpy':
+            return self.loadSingleAscDtmInBulk(path)
+
+        with openAscFile(path) as f:
+
+            counter = 0
+            header = {}
+            dtm = []
+
+            for l in f:
+
+                if l.endswith('\n'):
+                    l = l[:l.index('\n')]
+
+                if l.startswith(' '):
+                    l = l[1:]
+
+                l = l.split(f'{self.dataSep}')
+
+                if counter < 6:
+                    if any(map(lambda x: x in self.headerComponents, l)):
+                        counter += 1
+                        try:
+                            header[l[0]] = int(l[1])
+                        except:
+                            header[l[0]] = float(l[1])
+
+                else:
+                    heights = []
+                    for el in l:
+                        try:
+                            heights.append(int(el))
+                        except:
+                            heights.append(float(el))
+                    dtm.append(heights)
+
+        return header, np.array(dtm, dtype=self.dtype)
+
+
+    def readAscHeader(self, f):
+        """
+        Args:
+            f - file object of an *.asc DTM file, opened in text mode and positioned at the beginning of the file
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file (after
+                reading, the file object is positioned at the first line of terrain heights)
+        """
+        counter = 0
+        header = {}
+
+        while counter < 6:
+            l = f.readline()
+
+            if not l:
+                raise ValueError(f'Unexpected end of file while reading the header of {getattr(f, "name", "*.asc file")}')
+
+            l = l.rstrip('\r\n')
+
+            if l.startswith(' '):
+                l = l[1:]
+
+            l = [el for el in l.split(f'{self.dataSep}') if el.strip()]
+
+            if any(map(lambda x: x in self.headerComponents, l)):
+                counter += 1
+                try:
+                    header[l[0]] = int(l[1])
+                except:
+                    header[l[0]] = float(l[1])
+
+        return header
+
+
+    def loadSingleAscDtmInBulk(self, path, rowsPerChunk = 256):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            rowsPerChunk - int - number of lines of terrain heights parsed at once (256 by default)
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            dtm - np.array() with a (nrows, ncols) shape and 'dtype' data type, storing terrain heights
+        """
+        with openAscFile(path) as f:
+
+            header = self.readAscHeader(f)
+            dtm = self.parseAscRows(f, path, header[self.headerComponents[1]], header[self.headerComponents[0]],
+                                    rowsPerChunk)
+
+        return header, dtm
+
+
+    def loadSingleAscDtmRows(self, path, rowStart, rowEnd, rowsPerChunk = 256):
+        """
+        Parses only the given range of rows of a dataset (lines above are skipped without parsing, lines below are not
+        read at all). If the dataset is cached, the rows are taken from the cache.
+
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            rowStart, rowEnd - ints - range of rows of the dataset (counted from the top, rowEnd excluded)
+            rowsPerChunk - int - number of lines of terrain heights parsed at once (256 by default)
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            dtm - np.array() with a (rowEnd - rowStart, ncols) shape and 'dtype' data type, storing terrain heights
+        """
+        start = time.perf_counter()
+        cached = self.cache.load(path, self.findCacheKeyParams()) if self.cache is not None else None
+
+        if cached is not None:
+            header, dtm = cached[0], cached[1][rowStart:rowEnd]
+            bytesRead = dtm.nbytes
+        else:
+            with openAscFile(path) as f:
+
+                header = self.readAscHeader(f)
+
+                for _ in islice(f, rowStart):
+                    pass
+
+                dtm = self.parseAscRows(f, path, rowEnd - rowStart, header[self.headerComponents[0]], rowsPerChunk)
+
+                # position of the binary buffer (in decompressed bytes for compressed datasets) - lines below rowEnd
+                # are read only as far as the last read-ahead
+                bytesRead = f.buffer.tell()
+
+        self.recordTile(self.findDatasetName(path), 'load', time.perf_counter() - start, dtm.size, bytesRead)
+
+        return header, dtm
+
+
+    def parseAscRows(self, f, path, nrows, ncols, rowsPerChunk = 256, dtm = None):
+        """
+        Args:
+            f - file object of an *.asc DTM file, positioned at the first line to parse
+            path - String - path to the *.asc DTM file, used in error messages
+            nrows, ncols - ints - number of lines to parse and number of heights in each of them
+            rowsPerChunk - int - number of lines of terrain heights parsed at once (256 by default)
+            dtm - np.array() with a (nrows, ncols) shape, which terrain heights are parsed into (None by default - a new
+                np.array() is allocated)
+        Returns:
+            dtm - np.array() with a (nrows, ncols) shape and 'dtype' data type, storing terrain heights
+        """
+        if dtm is None:
+            dtm = np.empty((nrows, ncols), dtype=self.dtype)
+
+        for rowStart in range(0, nrows, rowsPerChunk):
+            rowEnd = min(rowStart + rowsPerChunk, nrows)
+            lines = ''.join(islice(f, rowEnd - rowStart))
+
+            # np.fromstring() treats ' ' as any whitespace (newlines included), so other separators are swapped to it
+            if self.dataSep.strip():
+                lines = lines.replace(self.dataSep, ' ')
+
+            heights = np.fromstring(lines, dtype=self.dtype if self.dtype.kind == 'f' else np.float64, sep=' ')
+
+            if heights.size != (rowEnd - rowStart) * ncols:
+                raise ValueError(f'{path}: expected {ncols} values in each of rows {rowStart}-{rowEnd - 1}, '
+                                 f'but {heights.size} values were read')
+
+            dtm[rowStart:rowEnd] = heights.reshape(rowEnd - rowStart, ncols)
+
+        return dtm
+
+
+    @measuredStage('load')
+    @keepingZipArchivesOpen
+    def loadMultipleAscDtms(self):
+        """
+        Returns:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function as values,
+                and file names as keys.
+            dtms - nested dictionary, storing multiple 'dtm' np.arrays(), obtained with loadSingleAscDtm() function as values,
+                and file names as keys (DtmsLoadedOnDemand() mapping, if streaming mode is on).
+        """
+        if self.streaming:
+            return self.loadMultipleAscHeaders()
+
+        self.log('Loading datasets...')
+
+        if self.workers > 1:
+            return self.loadMultipleAscDtmsInParallel()
+
+        headers = {}
+        dtms = {}
+
+        files = self.findInputFiles()
+
+        for i, file in enumerate(files):
+            self.log(f'Loading dataset #{i + 1}/{len(files)} - {file}')
+            header, dtm = self.loadSingleAscDtm(os.path.join(self.inputCatalog, file))
+            headers[self.findDatasetName(file)] = header
+            dtms[self.findDatasetName(file)] = dtm
+
+        return headers, dtms
+
+
+    def findInputFiles(self):
+        """
+        Returns:
+            files - list of Strings - paths of datasets relative to the input catalog, in os.listdir() order - *.asc files
+                (also compressed ones - see ASC_EXTENSIONS) and '<archive>.zip/<member>' paths of *.asc members of *.zip
+                archives (in order of the archive)
+        Raises:
+            ValueError - if two datasets have the same name (see findDatasetName()), e.g. 'a.zip/t1.asc' and 'b.zip/t1.asc'
+                or 't1.asc' and 't1.asc.gz' - headers, terrain heights and cache entries of datasets are keyed by names
+        """
+        files = []
+        names = {}
+
+        for file in os.listdir(self.inputCatalog):
+
+            if isAscFile(file):
+                files.append(file)
+
+            elif file.lower().endswith('.zip') and os.path.isfile(os.path.join(self.inputCatalog, file)):
+                with zipfile.ZipFile(os.path.join(self.inputCatalog, file)) as archive:
+                    files.extend(f'{file}/{member}' for member in archive.namelist()
+                                 if not member.endswith('/') and member.lower().endswith('.asc'))
+
+        for file in files:
+            name = self.findDatasetName(file)
+
+            if name in names:
+                raise ValueError(f"Datasets {names[name]} and {file} in {self.inputCatalog} have the same name '{name}'")
+
+            names[name] = file
+
+        return files
+
+
+    def loadSingleAscHeader(self, path):
+        """
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+        """
+        with openAscFile(path) as f:
+            return self.readAscHeader(f)
+
+
+    def loadMultipleAscHeaders(self):
+        """
+        Reads only the headers of datasets - terrain heights are loaded later, one dataset at a time.
+
+        Returns:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with scanHeaders() function
+                as values, and file names as keys.
+            dtms - DtmsLoadedOnDemand() mapping, which is loading 'dtm' np.arrays() with loadSingleAscDtm() function on
+                access, with file names as keys.
+        """
+        tileIndex = self.scanHeaders()
+
+        return self.tileIndexToHeaders(tileIndex), DtmsLoadedOnDemand(self, dict(zip(tileIndex['name'], tileIndex['path'])))
+
+
+    @measuredStage('scan')
+    @keepingZipArchivesOpen
+    def scanHeaders(self):
+        """
+        Reads only the first lines (header part) of each *.asc DTM file from input catalog.
+
+        Returns:
+            tileIndex - np.array() with TILE_INDEX_FIELDS structured dtype - one record (name, path, xll, yll, ncols,
+                nrows, cellsize, nodata) per dataset, in findInputFiles() order
+        """
+        self.log('Scanning headers of datasets...')
+
+        records = []
+
+        for file in self.findInputFiles():
+            path = os.path.join(self.inputCatalog, file)
+            records.append((self.findDatasetName(file), path) + self.headerToTileIndexRecord(self.loadSingleAscHeader(path), path))
+
+        self.log(f'Headers of {len(records)} datasets scanned\n')
+
+        return self.createTileIndex(records)
+
+
+    def headerToTileIndexRecord(self, header, source = 'header'):
+        """
+        Args:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            source - String - name of the dataset used in error messages ('header' by default)
+        Returns:
+            record - tuple - (xll, yll, ncols, nrows, cellsize, nodata) values of the header
+        """
+        missingComponents = [component for component in self.headerComponents if component not in header]
+
+        if missingComponents:
+            raise ValueError(f'{source}: missing header components: {", ".join(missingComponents)}')
+
+        return (header[self.headerComponents[2]], header[self.headerComponents[3]], header[self.headerComponents[0]],
+                header[self.headerComponents[1]], header[self.headerComponents[4]], header[self.headerComponents[-1]])
+
+
+    def createTileIndex(self, records):
+        """
+        Args:
+            records - list of tuples - (name, path, xll, yll, ncols, nrows, cellsize, nodata) values of each dataset
+        Returns:
+            tileIndex - np.array() with TILE_INDEX_FIELDS structured dtype
+        """
+        nameLength = max([len(record[0]) for record in records], default=1)
+        pathLength = max([len(record[1]) for record in records], default=1)
+
+        return np.array(records, dtype=[('name', f'U{nameLength}'), ('path', f'U{pathLength}')] + TILE_INDEX_FIELDS[2:])
+
+
+    def asTileIndex(self, headers):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function
+        Returns:
+            tileIndex - np.array() with TILE_INDEX_FIELDS structured dtype ('path' is empty for headers given as dictionary)
+        """
+        if isinstance(headers, np.ndarray):
+            return headers
+
+        return self.createTileIndex([(k, '') + self.headerToTileIndexRecord(v, k) for k, v in headers.items()])
+
+
+    def tileIndexToHeaders(self, tileIndex):
+        """
+        Args:
+            tileIndex - np.array() with TILE_INDEX_FIELDS structured dtype, obtained with scanHeaders() function
+        Returns:
+            headers - nested dictionary, storing multiple 'header' dictionaries as values, and file names as keys.
+        """
+        fields = ['ncols', 'nrows', 'xll', 'yll', 'cellsize', 'nodata']
+
+        return {
+            str(tile['name']): {component: asPythonNumber(tile[field]) for component, field in zip(self.headerComponents, fields)}
+            for tile in tileIndex
+        }
+
+
+    def loadSingleAscDtmToNpyFile(self, path, npyPath):
+        """
+        Parses terrain heights straight into a memory-mapped *.npy file ('numpy' parser), so that they are not copied.
+
+        Args:
+            path - String, which is specifying the full file path to the *.asc DTM file
+            npyPath - String - full path to the *.npy file, which the terrain heights are going to be parsed into
+        Returns:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            loadRecord - dictionary - metrics of loading the dataset (recorded by recordTile() in the worker process)
+        """
+        start = time.perf_counter()
+
+        if self.parser == 'numpy':
+            with openAscFile(path) as f:
+
+                header = self.readAscHeader(f)
+                nrows, ncols = header[self.headerComponents[1]], header[self.headerComponents[0]]
+
+                npyDtm = np.lib.format.open_memmap(npyPath, mode='w+', dtype=self.dtype, shape=(nrows, ncols))
+                self.parseAscRows(f, path, nrows, ncols, dtm=npyDtm)
+        else:
+            header, dtm = self.parseSingleAscDtm(path)
+
+            npyDtm = np.lib.format.open_memmap(npyPath, mode='w+', dtype=dtm.dtype, shape=dtm.shape)
+            npyDtm[:] = dtm
+
+        npyDtm.flush()
+        cells = npyDtm.size
+        del npyDtm
+
+        self.recordTile(self.findDatasetName(path), 'load', time.perf_counter() - start, cells, statAscFile(path)[0])
+
+        return header, self.metrics['tiles'][self.findDatasetName(path)]['load']
+
+
+    def loadMultipleAscDtmsInParallel(self):
+        """
+        Loads datasets in a pool of 'workers' processes. Terrain heights are passed back to the main process through
+        *.npy files (stored in a temporary catalog), which workers parse into and the main process memory-maps, so that
+        large arrays are neither pickled nor copied.
+
+        Returns:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function as values,
+                and file names as keys.
+            dtms - nested dictionary, storing multiple 'dtm' np.arrays() (read-only np.memmaps()), obtained with
+                loadSingleAscDtm() function as values, and file names as keys.
+        """
+        headers = {}
+        dtms = {}
+
+        files = list(enumerate(self.findInputFiles()))
+
+        if self.cache is not None:
+            return self.loadMultipleAscDtmsInParallelThroughCache(files)
+
+        with tempfile.TemporaryDirectory(prefix='merge_asc_dtms_') as tmpCatalog, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=startLoadingWorker, initargs=(self,)) as executor:
+
+            npyPaths = [os.path.join(tmpCatalog, f'{i}.npy') for i, _ in files]
+            loadedHeaders = executor.map(loadAscDtmToNpyFile, [os.path.join(self.inputCatalog, file) for _, file in files],
+                                         npyPaths)
+
+            for (i, file), npyPath, (header, loadRecord) in zip(files, npyPaths, loadedHeaders):
+                self.log(f'Loading dataset #{i + 1}/{len(files)} - {file}')
+                self.recordTile(self.findDatasetName(file), 'load', loadRecord['seconds'], loadRecord['cells'],
+                                loadRecord['bytes read'])
+                headers[self.findDatasetName(file)] = header
+
+                # the mapping outlives the removed file on POSIX systems - mapped files cannot be removed on Windows, so
+                # heights are read into memory there
+                dtms[self.findDatasetName(file)] = np.load(npyPath, mmap_mode='r' if os.name != 'nt' else None)
+                os.remove(npyPath)
+
+        return headers, dtms
+
+
+    @keepingZipArchivesOpen
+    def loadMultipleAscDtmsInParallelThroughCache(self, files):
+        """
+        Worker processes parse datasets into the cache, and the main process memory-maps them from there.
+
+        Args:
+            files - list of tuples - (position in findInputFiles() order, path relative to the input catalog) of datasets
+        Returns:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function as values,
+                and file names as keys.
+            dtms - nested dictionary, storing multiple 'dtm' np.arrays(), obtained with loadSingleAscDtm() function as values,
+                and file names as keys.
+        """
+        headers = {}
+        dtms = {}
+
+        paths = [os.path.join(self.inputCatalog, file) for _, file in files]
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=startLoadingWorker, initargs=(self,)) as executor:
+
+            for (i, file), path, header in zip(files, paths, executor.map(loadAscDtmToCache, paths)):
+                self.log(f'Loading dataset #{i + 1}/{len(files)} - {file}')
+                headers[self.findDatasetName(file)], dtms[self.findDatasetName(file)] = self.loadSingleAscDtm(path)
+
+        # entries saved by the workers are counted only by their own processes
+        self.cache.evict(rescan=True)
+
+        return headers, dtms
+
+
+    @measuredStage('stats')
+    def findStatisticsForDatasets(self, headers):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+        Returns:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+        """
+        self.log('Calculating statistics for datasets...\n')
+        self.pause()
+
+        tileIndex = self.asTileIndex(headers)
+
+        # 'mean cell size' and 'min X'/'min Y' describe the target grid, which all of the datasets are placed on
+        cellSize = self.findTargetCellSize(tileIndex)
+        centerShifts = self.findCenterShifts(tileIndex, cellSize)
+        minX, minY = (tileIndex['xll'] + centerShifts).min(), (tileIndex['yll'] + centerShifts).min()
+
+        if self.targetOrigin is not None:
+            minX = self.targetOrigin[0] + floor((minX - self.targetOrigin[0]) / cellSize + ALIGNMENT_TOLERANCE) * cellSize
+            minY = self.targetOrigin[1] + floor((minY - self.targetOrigin[1]) / cellSize + ALIGNMENT_TOLERANCE) * cellSize
+
+        return {
+            'mean cols num': int(np.mean(tileIndex['ncols'])),
+            'mean rows num': int(np.mean(tileIndex['nrows'])),
+            'mean cell size': cellSize,
+            'min X': asPythonNumber(minX),
+            'max X': asPythonNumber(tileIndex['xll'].max()),
+            'min Y': asPythonNumber(minY),
+            'max Y': asPythonNumber(tileIndex['yll'].max()),
+            'no data': self.findOutputNoData(tileIndex)
+        }
+
+
+    def findTargetCellSize(self, headers):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+        Returns:
+            cellSize - int/float - cell size of the target grid - targetCellSize or the smallest cell size of datasets
+                (the cell size of all of them, if they are not mixed)
+        """
+        if self.targetCellSize is not None:
+            return asPythonNumber(self.targetCellSize)
+
+        return asPythonNumber(self.asTileIndex(headers)['cellsize'].min())
+
+
+    def findCenterShifts(self, headers, cellSize):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            cellSize - int/float - cell size of the target grid
+        Returns:
+            centerShifts - np.array() of floats (or 0.) - shifts of datasets' header coordinates to the convention of the
+                target grid - '*center' headers point to the center of the lower left cell, which is of another size in
+                datasets of another cell size (0. for '*corner' headers)
+        """
+        if 'center' not in self.headerComponents[2].lower():
+            return 0.
+
+        return (cellSize - self.asTileIndex(headers)['cellsize']) / 2
+
+
+    def findOutputNoData(self, headers):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+        Returns:
+            noData - int/float - nodata_value of the final DTM - the most common nodata_value of datasets (the smallest one
+                of equally common ones) - nodata_value of the other datasets is replaced with it (see normalizeNoData())
+        """
+        values, counts = np.unique(self.asTileIndex(headers)['nodata'], return_counts=True)
+
+        return asPythonNumber(values[np.argmax(counts)])
+
+
+    def findSpatialDistributionOfDatasets(self, statistics):
+        """
+        Args:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+        Returns:
+            numOfDatasetsAlongX - int - number of datasets which are spatially distributed along X axis (how many datasets
+                there are placed along X axis)
+            numOfDatasetsAlongY - int - number of datasets which are spatially distributed along Y axis (how many datasets
+                there are placed along Y axis)
+        """
+        self.log('Checking the spatial distribution of datasets...\n')
+        self.pause()
+
+        numOfDatasetsAlongX = int(
+            round((statistics['max X'] - statistics['min X']) / (statistics['mean cols num'] * statistics['mean cell size']),
+                  0)) + 1
+        numOfDatasetsAlongY = int(
+            round((statistics['max Y'] - statistics['min Y']) / (statistics['mean rows num'] * statistics['mean cell size']),
+                  0)) + 1
+        return numOfDatasetsAlongX, numOfDatasetsAlongY
+
+
+    @measuredStage('sort')
+    def sortDatasets(self, headers, numOfDatasetsAlongX = None):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            numOfDatasetsAlongX - int - not used anymore (datasets are grouped by their own Y coordinates, so that missing
+                tiles and ragged edges don't mix rows up) - kept for compatibility (None by default)
+        Returns:
+            sortedDatasets - list storing lists of Strings, where each list is storing datasets with the same Y coordinate
+                (rounded down to the cell size) - lists are sorted by Y coordinates (descending) and the order of the Strings
+                on each list is corresponding with the result of sorting X coordinates (ascending)
+        """
+        self.log('Sorting datasets by Y (descending) & by X (ascending)...\n')
+        self.pause()
+
+        tileIndex = self.asTileIndex(headers)
+
+        yAsCells = np.floor(tileIndex['yll'] / tileIndex['cellsize'])
+
+        sortedByY = list(zip(tileIndex['name'].tolist(), tileIndex['xll'].tolist(), yAsCells.tolist()))
+        sortedByY.sort(key=itemgetter(2), reverse=True)
+
+        splittedBySimilarY = [list(group) for _, group in groupby(sortedByY, key=itemgetter(2))]
+
+        sortedByXY = []
+
+        for i in range(len(splittedBySimilarY)):
+            splittedBySimilarY[i].sort(key=itemgetter(1), reverse=False)
+
+            tmp = []
+
+            for j in range(len(splittedBySimilarY[i])):
+                tmp.append(splittedBySimilarY[i][j][0])
+            sortedByXY.append(tmp)
+
+        return sortedByXY
+
+
+    def findTilesWithMaxCoords(self, headers):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+        Returns:
+            xMaxTile - String - file name of the dataset with max X coordinate
+            yMaxTile - String - file name of the dataset with max Y coordinate
+        """
+        self.log('Searching for tiles with max X & max Y coordinates...\n')
+        self.pause()
+
+        tileIndex = self.asTileIndex(headers)
+
+        # np.argmax() returns the first of the tiles with max coordinate, as the datasets are ordered in the input
+        xMaxTile = str(tileIndex['name'][np.argmax(tileIndex['xll'])])
+        yMaxTile = str(tileIndex['name'][np.argmax(tileIndex['yll'])])
+
+        return xMaxTile, yMaxTile
+
+
+    def createFinalArrayFilledWithNoDataValues(self, statistics, headers, xMaxTile, yMaxTile):
+        """
+        Args:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            xMaxTile - String - file name of the dataset with max X coordinate
+            yMaxTile - String - file name of the dataset with max Y coordinate
+
+        Returns:
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+        """
+        self.log('Preparing final DTM structure...\n')
+        self.pause()
+
+        return self.createFinalArray(self.findFinalDtmArrayShape(statistics, headers, xMaxTile, yMaxTile), statistics)
+
+
+    @measuredStage('allocate')
+    def createFinalArray(self, finalShape, statistics):
+        """
+        Args:
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            finalDtmArray - np.array() (np.memmap() in streaming mode) with a finalShape shape, filled with nodata_value
+        """
+        if self.streaming:
+            return self.createFinalArrayOnDisk(finalShape, statistics)
+
+        return np.full(finalShape, statistics['no data'], dtype=self.dtype)
+
+
+    def findFinalDtmArrayShape(self, statistics, headers, xMaxTile, yMaxTile):
+        """
+        Args:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            xMaxTile - String - file name of the dataset with max X coordinate (not used anymore - the shape covers the
+                extents of all of the datasets - kept for compatibility)
+            yMaxTile - String - file name of the dataset with max Y coordinate (as above)
+
+        Returns:
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+        """
+        colStart, colEnd, rowBottom, rowTop = self.findTileExtentsAsCells(headers, statistics)
+
+        return int(rowTop.max()), int(colEnd.max())
+
+
+    def findTileOffsets(self, headers, statistics):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            xOffsets, yOffsets - np.arrays() of floats - offsets of lower left corners of datasets from the lower left
+                corner of the target grid, as (fractional) numbers of target cells
+        """
+        tileIndex = self.asTileIndex(headers)
+        centerShifts = self.findCenterShifts(tileIndex, statistics['mean cell size'])
+
+        return ((tileIndex['xll'] + centerShifts - statistics['min X']) / statistics['mean cell size'],
+                (tileIndex['yll'] + centerShifts - statistics['min Y']) / statistics['mean cell size'])
+
+
+    def findTileExtentsAsCells(self, headers, statistics):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            colStart, colEnd, rowBottom, rowTop - np.arrays() of ints - target cells covered by datasets, counted from the
+                lower left corner of the target grid (colEnd and rowTop excluded) - datasets, which are not aligned with
+                the target grid, cover every target cell they are intersecting
+        """
+        tileIndex = self.asTileIndex(headers)
+
+        xOffsets, yOffsets = self.findTileOffsets(tileIndex, statistics)
+        ratios = tileIndex['cellsize'] / statistics['mean cell size']
+
+        return (np.floor(xOffsets + ALIGNMENT_TOLERANCE).astype(np.int64),
+                np.ceil(xOffsets + tileIndex['ncols'] * ratios - ALIGNMENT_TOLERANCE).astype(np.int64),
+                np.floor(yOffsets + ALIGNMENT_TOLERANCE).astype(np.int64),
+                np.ceil(yOffsets + tileIndex['nrows'] * ratios - ALIGNMENT_TOLERANCE).astype(np.int64))
+
+
+    def findAlignedTiles(self, headers, statistics):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            aligned - np.array() of bools - True for datasets of the target cell size, which cells are matching cells of the
+                target grid (they are copied as they are - the other ones are resampled with resampleTileToGrid())
+        """
+        tileIndex = self.asTileIndex(headers)
+
+        xOffsets, yOffsets = self.findTileOffsets(tileIndex, statistics)
+        ratios = tileIndex['cellsize'] / statistics['mean cell size']
+
+        return ((np.abs(ratios - 1) * np.maximum(tileIndex['ncols'], tileIndex['nrows']) <= ALIGNMENT_TOLERANCE) &
+                (np.abs(xOffsets - np.round(xOffsets)) <= ALIGNMENT_TOLERANCE) &
+                (np.abs(yOffsets - np.round(yOffsets)) <= ALIGNMENT_TOLERANCE))
+
+
+    def resampleTileToGrid(self, curDtm, tile, statistics):
+        """
+        Resamples a dataset to the target cells it is covering (its window in findTileWindows()), according to resampling:
+            'nearest' - height of the dataset's cell, which the target cell's center is in
+            'bilinear' - bilinear interpolation between centers of the 4 nearest cells of the dataset - cells equal to
+                nodata_value are left out and weights of the remaining ones are normalized
+            'average' - mean of the dataset's cells, which centers are in the target cell (for target grids coarser than
+                the dataset) - target cells without any of them get the nearest height
+        Target cells, which centers are outside of the dataset, are set to nodata_value.
+
+        Args:
+            curDtm - np.array() with a (nrows, ncols) shape - 'dtm' of the dataset
+            tile - np.array() with TILE_INDEX_FIELDS structured dtype, storing the dataset's record only
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            resampledDtm - np.array() with a (rowTop - rowBottom, colEnd - colStart) shape (findTileExtentsAsCells()) and
+                'dtype' data type
+        """
+        nrows, ncols = curDtm.shape
+        noData = statistics['no data']
+
+        (xOffset,), (yOffset,) = self.findTileOffsets(tile, statistics)
+        (colStart,), (colEnd,), (rowBottom,), (rowTop,) = self.findTileExtentsAsCells(tile, statistics)
+        ratio = tile['cellsize'][0] / statistics['mean cell size']
+
+        dataMask = curDtm != curDtm.dtype.type(tile['nodata'][0])
+
+        # fractional indices of the dataset's cells at centers of target columns and rows (rows counted from the top)
+        colIndices = (np.arange(colStart, colEnd) + .5 - xOffset) / ratio - .5
+        rowIndices = nrows - (np.arange(rowTop - 1, rowBottom - 1, -1) + .5 - yOffset) / ratio - .5
+
+        validCols = (colIndices >= -.5) & (colIndices < ncols - .5)
+        validRows = (rowIndices >= -.5) & (rowIndices < nrows - .5)
+
+        nearestCols = np.clip(np.floor(colIndices + .5).astype(np.int64), 0, ncols - 1)
+        nearestRows = np.clip(np.floor(rowIndices + .5).astype(np.int64), 0, nrows - 1)
+
+        nearest = np.where(dataMask[np.ix_(nearestRows, nearestCols)], curDtm[np.ix_(nearestRows, nearestCols)], noData)
+
+        if self.resampling == 'bilinear':
+            leftCols, topRows = np.floor(colIndices).astype(np.int64), np.floor(rowIndices).astype(np.int64)
+            colWeights, rowWeights = colIndices - leftCols, rowIndices - topRows
+
+            sums = np.zeros(nearest.shape)
+            weights = np.zeros(nearest.shape)
+
+            for rowShift, rowWeight in ((0, 1 - rowWeights), (1, rowWeights)):
+                for colShift, colWeight in ((0, 1 - colWeights), (1, colWeights)):
+                    rows, cols = topRows + rowShift, leftCols + colShift
+                    inside = ((rows >= 0) & (rows < nrows))[:, np.newaxis] & ((cols >= 0) & (cols < ncols))[np.newaxis, :]
+                    rows, cols = np.ix_(np.clip(rows, 0, nrows - 1), np.clip(cols, 0, ncols - 1))
+
+                    cornerWeights = np.where(inside & dataMask[rows, cols], np.outer(rowWeight, colWeight), 0.)
+                    sums += cornerWeights * curDtm[rows, cols]
+                    weights += cornerWeights
+
+            resampledDtm = np.where(weights > 0, sums / np.maximum(weights, 1e-12), noData)
+
+        elif self.resampling == 'average':
+            # target cell of each of the dataset's cells' centers
+            targetCols = np.floor(xOffset + (np.arange(ncols) + .5) * ratio).astype(np.int64) - colStart
+            targetRows = (rowTop - 1) - np.floor(yOffset + (nrows - np.arange(nrows) - .5) * ratio).astype(np.int64)
+
+            targets = (targetRows[:, np.newaxis] * (colEnd - colStart) + targetCols[np.newaxis, :])[dataMask]
+            size = (rowTop - rowBottom) * (colEnd - colStart)
+
+            counts = np.bincount(targets, minlength=size).reshape(nearest.shape)
+            sums = np.bincount(targets, weights=curDtm[dataMask], minlength=size).reshape(nearest.shape)
+
+            resampledDtm = np.where(counts > 0, sums / np.maximum(counts, 1), nearest)
+
+        else:
+            resampledDtm = nearest
+
+        resampledDtm = np.where(validRows[:, np.newaxis] & validCols[np.newaxis, :], resampledDtm, noData)
+
+        return resampledDtm.astype(self.dtype)
+
+
+    def normalizeNoData(self, curDtm, tileNoData, statistics):
+        """
+        Args:
+            curDtm - np.array() with a (nrows, ncols) shape - 'dtm' of the dataset
+            tileNoData - int/float - nodata_value of the dataset
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+
+        Returns:
+            curDtm - np.array() with cells equal to the dataset's nodata_value set to nodata_value of the final DTM (the
+                same np.array(), if both of the values are equal)
+        """
+        # values are compared in the data type of heights (e.g. -3.40282346639e+38 is not exactly representable in float32)
+        tileNoData = curDtm.dtype.type(tileNoData)
+
+        if tileNoData == curDtm.dtype.type(statistics['no data']):
+            return curDtm
+
+        return np.where(curDtm == tileNoData, statistics['no data'], curDtm).astype(self.dtype, copy=False)
+
+
+    def findTileWindows(self, headers, statistics, finalShape):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+
+        Returns:
+            windows - np.array() of ints with a (number of datasets, 4) shape - rowStart, rowEnd, colStart, colEnd window
+                of the final DTM array covered by each dataset (the same as findTileWindowInFinalDtmArray() is giving)
+        """
+        colStart, colEnd, rowBottom, rowTop = self.findTileExtentsAsCells(headers, statistics)
+
+        return np.stack([finalShape[0] - rowTop, finalShape[0] - rowBottom, colStart, colEnd], axis=1)
+
+
+    @measuredStage('allocate')
+    def createFinalArrayOnDisk(self, finalShape, statistics, rowsPerChunk = 1024, mosaicPath = None):
+        """
+        Args:
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            rowsPerChunk - int - number of rows filled with nodata_value at once (1024 by default)
+            mosaicPath - String - path to the *.npy file backing the array (None by default - '<outputFileName>_mosaic.npy'
+                file in the output catalog)
+
+        Returns:
+            finalDtmArray - np.memmap() with a finalShape shape, backed by the mosaicPath file and filled with nodata_value
+        """
+        mosaicPath = mosaicPath or os.path.join(self.outputCatalog, os.path.splitext(self.outputFileName)[0] + '_mosaic.npy')
+
+        return self.createArrayOnDisk(finalShape, statistics, mosaicPath, rowsPerChunk)
+
+
+    def createArrayOnDisk(self, shape, statistics, path, rowsPerChunk = 1024):
+        """
+        Allocates a memory-mapped array outside of the 'allocate' stage (also used for overviews in streaming mode).
+
+        Args:
+            shape - tuple - (nrows, ncols) shape of the array
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            path - String - path to the *.npy file backing the array
+            rowsPerChunk - int - number of rows filled with nodata_value at once (1024 by default)
+
+        Returns:
+            array - np.memmap() with the given shape, backed by the path file and filled with nodata_value
+        """
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=shape)
+
+        for rowStart in range(0, shape[0], rowsPerChunk):
+            array[rowStart:rowStart + rowsPerChunk] = statistics['no data']
+
+        return array
+
+
+    def findTileWindowInFinalDtmArray(self, header, statistics, tileShape, finalShape):
+        """
+        Args:
+            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            tileShape - tuple - (nrows, ncols) shape of the dataset's 'dtm' np.array()
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+
+        Returns:
+            rowStart, rowEnd, colStart, colEnd - ints - window of the final DTM array covered by the dataset
+                (finalDtmArray[rowStart:rowEnd, colStart:colEnd] has the same shape as the dataset's 'dtm' np.array(),
+                if the dataset is aligned with the target grid)
+        """
+        header = dict(header, **{self.headerComponents[0]: tileShape[1], self.headerComponents[1]: tileShape[0]})
+
+        rowStart, rowEnd, colStart, colEnd = self.findTileWindows({'dataset': header}, statistics, finalShape)[0].tolist()
+
+        if rowStart < 0 or colEnd > finalShape[1]:
+            raise IndexError(f'Dataset window rows {rowStart}:{rowEnd}, cols {colStart}:{colEnd} is outside of the '
+                             f'final DTM array with shape {finalShape}')
+
+        return rowStart, rowEnd, colStart, colEnd
+
+
+    @measuredStage('fill')
+    @keepingZipArchivesOpen
+    def fillFinalDtmArrayWithData(self, sortedDatasets, headers, statistics, dtms, finalDtmArray):
+        """
+        Args:
+            sortedDatasets - list storing lists of Strings, obtained with sortDatasets() function - datasets are merged in
+                reversed order of the lists (from the bottom row up) and in order of the Strings on each list
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            dtms - nested dictionary, storing multiple 'dtm' np.arrays(), obtained with loadSingleAscDtm() function as values,
+                and file names as keys.
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+        """
+        self.log('Merging DTMs...')
+        self.pause()
+
+        self.resetReport()
+
+        tileIndex = self.asTileIndex(headers)
+        positions = {name: position for position, name in enumerate(tileIndex['name'].tolist())}
+
+        # each dataset is placed by its own coordinates, and only the ones overlapping other datasets need overlapRule
+        windows = self.findTileWindows(tileIndex, statistics, finalDtmArray.shape)
+        gridIndex = TileGridIndex(windows)
+        overlapping = gridIndex.findOverlappingTiles()
+        aligned = self.findAlignedTiles(tileIndex, statistics)
+
+        if windows.size and (windows[:, 0].min() < 0 or windows[:, 3].max() > finalDtmArray.shape[1]):
+            raise IndexError(f'Datasets are outside of the final DTM array with shape {finalDtmArray.shape}')
+
+        counts = self.createOverlapCounts(finalDtmArray)
+
+        mergingOrder = [positions[curDataset] for datasetsOnSimilarY in reversed(sortedDatasets)
+                        for curDataset in datasetsOnSimilarY]
+        counters = {position: counter for counter, position in enumerate(mergingOrder)}
+
+        def mergeDataset(counter, position):
+            curDataset = tileIndex['name'][position]
+
+            self.log(f'Processing data from dataset #{counter + 1} - {curDataset}')
+
+            curDtm = dtms[curDataset]
+            start = time.perf_counter()
+
+            if not aligned[position]:
+                curDtm = self.resampleTileToGrid(curDtm, tileIndex[position:position + 1], statistics)
+            else:
+                curDtm = self.normalizeNoData(curDtm, tileIndex['nodata'][position], statistics)
+
+            rowStart, rowEnd, colStart, colEnd = windows[position].tolist()
+
+            if curDtm.shape != (rowEnd - rowStart, colEnd - colStart):
+                raise ValueError(f'{curDataset}: shape of the dataset {curDtm.shape} is not matching its header')
+
+            if self.report:
+                self.collectTileReport(curDataset, tileIndex['nodata'][position], finalDtmArray,
+                                       np.s_[rowStart:rowEnd, colStart:colEnd], curDtm, statistics['no data'],
+                                       overlapping=overlapping[position])
+
+            finalDtmWindow = finalDtmArray[rowStart:rowEnd, colStart:colEnd]
+
+            if not overlapping[position]:
+                finalDtmWindow[...] = curDtm
+            else:
+                self.resolveOverlap(finalDtmWindow, curDtm, statistics['no data'],
+                                    counts[rowStart:rowEnd, colStart:colEnd] if counts is not None else None)
+
+            if self.report:
+                laterWindows = [windows[later] for later in gridIndex.query(rowStart, rowEnd, colStart, colEnd)
+                                if counters[later] > counter] if overlapping[position] else []
+                self.collectFinalHeights(curDataset, finalDtmWindow, (rowStart, rowEnd, colStart, colEnd), laterWindows,
+                                         statistics['no data'])
+
+            self.recordTile(curDataset, 'merge', time.perf_counter() - start, curDtm.size)
+
+        self.mergeInBatches(self.findBatchingIndex(gridIndex), mergingOrder, mergeDataset)
+
+        # memory-mapped counts of streaming mode are needed only until all of the datasets are merged
+        if isinstance(counts, np.memmap):
+            countsPath = counts.filename
+            del counts
+            os.remove(countsPath)
+
+
+    def createOverlapCounts(self, finalDtmArray):
+        """
+        Args:
+            finalDtmArray - np.array() (np.memmap() in streaming mode) - the final DTM array (or a window of it), which
+                datasets are merged into
+        Returns:
+            counts - np.array() of uint16 with the finalDtmArray shape, filled with zeros - number of datasets averaged in
+                each cell so far, needed only by 'mean' overlapRule (None for the other rules) - memory-mapped to a
+                temporary '<mosaic name>_counts.npy' file next to a memory-mapped finalDtmArray, so that memory of
+                streaming mode stays bounded by the largest dataset
+        """
+        if self.overlapRule != 'mean':
+            return None
+
+        if not isinstance(finalDtmArray, np.memmap) or finalDtmArray.filename is None:
+            return np.zeros(finalDtmArray.shape, dtype=np.uint16)
+
+        countsPath = os.path.splitext(finalDtmArray.filename)[0] + '_counts.npy'
+
+        return np.lib.format.open_memmap(countsPath, mode='w+', dtype=np.uint16, shape=finalDtmArray.shape)
+
+
+    def findBatchingIndex(self, gridIndex):
+        """
+        Args:
+            gridIndex - TileGridIndex() built over windows of datasets
+        Returns:
+            gridIndex - TileGridIndex() used by mergeInBatches() - with report, built over windows grown by one cell, so
+                that datasets of one batch are not writing cells adjacent to edges of the others (compared as seams)
+        """
+        if not self.report or self.threads == 1:
+            return gridIndex
+
+        return TileGridIndex(gridIndex.windows + np.array([-1, 1, -1, 1]), gridIndex.bucketSize)
+
+
+    def mergeInBatches(self, gridIndex, mergingOrder, mergeDataset):
+        """
+        Calls mergeDataset for each dataset in merging order. With more than one thread, datasets are grouped into
+        batches of datasets not sharing any cells (TileGridIndex.findConflictFreeBatches()), and datasets of each batch
+        are merged at the same time on a thread pool (NumPy releases the GIL while copying and masking arrays), one batch
+        after another - so cells covered by more than one dataset are resolved in merging order anyway.
+
+        Args:
+            gridIndex - TileGridIndex() built over windows of datasets
+            mergingOrder - list of ints - positions of datasets in the order they are merged in
+            mergeDataset - function taking a counter (number of the dataset in merging order) and a position of a dataset
+        """
+        if self.threads == 1:
+            for counter, position in enumerate(mergingOrder):
+                mergeDataset(counter, position)
+            return
+
+        counters = {position: counter for counter, position in enumerate(mergingOrder)}
+
+        with ThreadPoolExecutor(self.threads) as executor:
+            for batch in gridIndex.findConflictFreeBatches(mergingOrder):
+                # list() waits for the whole batch and re-raises exceptions of the threads
+                list(executor.map(lambda position: mergeDataset(counters[position], position), batch))
+
+
+    def resolveOverlap(self, finalDtmWindow, curDtm, noData, countsWindow = None):
+        """
+        Writes heights of a dataset into its window of the final DTM array, according to overlapRule:
+            'first' - cells which are still equal to nodata_value are taken from the dataset ("first writer wins")
+            'last' - all of the dataset's heights (other than nodata_value) are written ("last writer wins")
+            'min'/'max' - lower/higher of the existing and the dataset's heights is kept
+            'mean' - heights of all of the datasets covering a cell are averaged
+
+        Args:
+            finalDtmWindow - np.array() - window of the final DTM array covered by the dataset (a view, modified in place)
+            curDtm - np.array() with the same shape - 'dtm' of the dataset
+            noData - int/float - nodata_value of the final DTM array
+            countsWindow - np.array() with the same shape - number of datasets averaged in each cell so far (modified in
+                place, required only by 'mean' overlapRule) (None by default)
+        """
+        if self.overlapRule == 'first':
+            noDataMask = finalDtmWindow == noData
+            finalDtmWindow[noDataMask] = curDtm[noDataMask]
+            return
+
+        dataMask = curDtm != noData
+
+        if self.overlapRule == 'last':
+            finalDtmWindow[dataMask] = curDtm[dataMask]
+
+        elif self.overlapRule in ('min', 'max'):
+            compare = np.less if self.overlapRule == 'min' else np.greater
+            replaceMask = dataMask & ((finalDtmWindow == noData) | compare(curDtm, finalDtmWindow))
+            finalDtmWindow[replaceMask] = curDtm[replaceMask]
+
+        else:
+            # running mean - count is 0 for cells, which are still equal to nodata_value
+            counts = countsWindow[dataMask].astype(np.float64)
+            heights, curHeights = finalDtmWindow[dataMask], curDtm[dataMask]
+            finalDtmWindow[dataMask] = np.where(counts == 0, curHeights, heights + (curHeights - heights) / (counts + 1))
+            countsWindow[dataMask] += 1
+
+
+    def findHeightDifferences(self, heights, otherHeights, noData):
+        """
+        Args:
+            heights, otherHeights - np.arrays() of the same shape
+            noData - int/float - nodata_value of the final DTM array
+        Returns:
+            differences - np.array() of float64 - absolute differences of heights in cells, where both of them are other
+                than nodata_value
+        """
+        dataMask = (heights != noData) & (otherHeights != noData)
+
+        return np.abs(heights[dataMask].astype(np.float64) - otherHeights[dataMask])
+
+
+    def collectTileReport(self, name, tileNoData, finalDtmArray, tileSlice, curDtm, noData, edges = (True, True),
+                          overlapping = True):
+        """
+        Adds raster statistics of a dataset to reportRecords - called before the dataset is written into the final DTM
+        array, so that its heights are compared with the heights already merged:
+            heights - number of cells and of nodata cells, sum, min and max of heights
+            overlap - absolute differences with heights already merged in the cells covered by the dataset
+            seam - absolute differences between cells on the dataset's bottom and left edges and adjacent cells outside of
+                it (datasets below and on the left are merged earlier, so each pair of neighbouring datasets is compared
+                once, whichever of them is merged again)
+
+        Args:
+            name - String - name of the dataset
+            tileNoData - int/float - nodata_value of the dataset (before normalizeNoData())
+            finalDtmArray - np.array() - the final DTM array (or a window of it), which the dataset is written into
+            tileSlice - tuple of slices - cells of finalDtmArray covered by curDtm
+            curDtm - np.array() - heights of the dataset in the target grid, with nodata_value of the final DTM
+            noData - int/float - nodata_value of the final DTM array
+            edges - tuple of 2 bools - True for the bottom and left sides of tileSlice, which are edges of the dataset (not
+                of its part inside a window) ((True, True) by default)
+            overlapping - bool - False, if the dataset is not sharing any cells with other datasets (True by default)
+        """
+        rows, cols = tileSlice
+        heights = curDtm[curDtm != noData]
+
+        if overlapping:
+            overlapDifferences = self.findHeightDifferences(curDtm, finalDtmArray[tileSlice], noData)
+        else:
+            overlapDifferences = np.empty(0)
+
+        # cells adjacent to the edges, which are inside finalDtmArray
+        neighbours = [
+            (edges[0] and rows.stop < finalDtmArray.shape[0], curDtm[-1], np.s_[rows.stop, cols]),
+            (edges[1] and cols.start > 0, curDtm[:, 0], np.s_[rows, cols.start - 1])
+        ]
+        seamDifferences = np.concatenate([np.empty(0)] + [self.findHeightDifferences(edge, finalDtmArray[neighbour], noData)
+                                                          for inside, edge, neighbour in neighbours if inside])
+
+        self.addToReport(name, {
+            'nodata value': asPythonNumber(tileNoData),
+            'cells': curDtm.size,
+            'nodata cells': curDtm.size - heights.size,
+            'sum': float(heights.sum(dtype=np.float64)),
+            'min': float(heights.min()) if heights.size else None,
+            'max': float(heights.max()) if heights.size else None,
+            'overlap cells': overlapDifferences.size,
+            'overlap sum': float(overlapDifferences.sum()),
+            'overlap max': float(overlapDifferences.max()) if overlapDifferences.size else None,
+            'seam cells': seamDifferences.size,
+            'seam sum': float(seamDifferences.sum()),
+            'seam max': float(seamDifferences.max()) if seamDifferences.size else None
+        })
+
+
+    def collectFinalHeights(self, name, finalDtmWindow, window, laterWindows, noData):
+        """
+        Adds heights of the cells of a dataset, which are final already (not covered by any dataset merged later), to its
+        record in reportRecords - called after the dataset is written into the final DTM array, so that statistics of the
+        final DTM are collected while datasets are placed (each cell is counted by the last dataset covering it).
+
+        Args:
+            name - String - name of the dataset
+            finalDtmWindow - np.array() - cells of the final DTM array covered by the dataset, after it was written
+            window - tuple of ints - rowStart, rowEnd, colStart, colEnd window of finalDtmWindow in the final DTM array
+            laterWindows - list - rowStart, rowEnd, colStart, colEnd windows of datasets merged later, which are sharing
+                cells with window
+            noData - int/float - nodata_value of the final DTM array
+        """
+        rowStart, rowEnd, colStart, colEnd = window
+        finalMask = np.ones(finalDtmWindow.shape, dtype=bool)
+
+        for laterRowStart, laterRowEnd, laterColStart, laterColEnd in laterWindows:
+            finalMask[max(laterRowStart, rowStart) - rowStart:min(laterRowEnd, rowEnd) - rowStart,
+                      max(laterColStart, colStart) - colStart:min(laterColEnd, colEnd) - colStart] = False
+
+        heights = finalDtmWindow[finalMask]
+        heights = heights[heights != noData]
+
+        self.addToReport(name, {
+            'final cells': heights.size,
+            'final sum': float(heights.sum(dtype=np.float64)),
+            'final min': float(heights.min()) if heights.size else None,
+            'final max': float(heights.max()) if heights.size else None
+        })
+
+
+    def addToReport(self, name, record):
+        """
+        Adds a record of cells of a dataset to its record in reportRecords - counts and sums are added up, and min/max
+        values are combined (a dataset may be placed in parts, e.g. one window or strip at a time).
+
+        Args:
+            name - String - name of the dataset
+            record - dictionary - record of collectTileReport() or collectFinalHeights() (or of both of them)
+        """
+        with self.metricsLock:
+            current = self.reportRecords.setdefault(name, {})
+
+            for key, value in record.items():
+
+                if key in ('cells', 'nodata cells', 'sum', 'overlap cells', 'overlap sum', 'seam cells', 'seam sum',
+                           'final cells', 'final sum'):
+                    current[key] = current.get(key, 0) + value
+
+                elif key in ('min', 'max', 'overlap max', 'seam max', 'final min', 'final max'):
+                    values = [combined for combined in (current.get(key), value) if combined is not None]
+                    current[key] = (min if key.endswith('min') else max)(values) if values else None
+
+                else:
+                    current[key] = value
+
+
+    def findMergingOrder(self, headers, positions = None):
+        """
+        Args:
+            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
+                as values, and file names as keys, or a tile index obtained with scanHeaders() function.
+            positions - list of ints - positions of datasets in headers to put in order (None by default - all datasets)
+        Returns:
+            positions - list of ints - positions of datasets in the order they are merged in by
+                fillFinalDtmArrayWithData() (from the bottom row up and from left to right, as in sortDatasets())
+        """
+        tileIndex = self.asTileIndex(headers)
+
+        yAsCells = np.floor(tileIndex['yll'] / tileIndex['cellsize'])
+        positions = range(len(tileIndex)) if positions is None else sorted(positions)
+
+        return sorted(positions, key=lambda position: (yAsCells[position], tileIndex['xll'][position]))
+
+
+    def findBboxWindow(self, bbox, statistics, finalShape):
+        """
+        Args:
+            bbox - tuple - (xmin, ymin, xmax, ymax) coordinates of the area to extract
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array of all of the datasets
+
+        Returns:
+            window - tuple of ints - rowStart, rowEnd, colStart, colEnd window of the final DTM array, which is covering
+                bbox (snapped outwards to whole cells and clipped to the final DTM array)
+        """
+        xmin, ymin, xmax, ymax = bbox
+        cellSize = statistics['mean cell size']
+
+        # corner of the lower left cell - header coordinates of '*center' headers point to the center of a cell
+        xLowerLeft, yLowerLeft = statistics['min X'], statistics['min Y']
+
+        if 'center' in self.headerComponents[2].lower():
+            xLowerLeft -= cellSize / 2
+            yLowerLeft -= cellSize / 2
+
+        colStart = max(0, int(floor((xmin - xLowerLeft) / cellSize)))
+        colEnd = min(finalShape[1], int(ceil((xmax - xLowerLeft) / cellSize)))
+        rowStart = max(0, finalShape[0] - int(ceil((ymax - yLowerLeft) / cellSize)))
+        rowEnd = min(finalShape[0], finalShape[0] - int(floor((ymin - yLowerLeft) / cellSize)))
+
+        if rowStart >= rowEnd or colStart >= colEnd:
+            raise ValueError(f'Bounding box {bbox} does not intersect the extent of datasets')
+
+        return rowStart, rowEnd, colStart, colEnd
+
+
+    def findWindowStatistics(self, statistics, finalShape, window):
+        """
+        Args:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array of all of the datasets
+            window - tuple of ints - rowStart, rowEnd, colStart, colEnd window of the final DTM array
+
+        Returns:
+            windowStatistics - copy of statistics with 'min X'/'min Y' moved to the lower left corner of the window (to be
+                used by constructFinalHeader() for a DTM covering only the window)
+        """
+        rowStart, rowEnd, colStart, colEnd = window
+
+        windowStatistics = dict(statistics)
+        windowStatistics['min X'] = asPythonNumber(statistics['min X'] + colStart * statistics['mean cell size'])
+        windowStatistics['min Y'] = asPythonNumber(statistics['min Y'] + (finalShape[0] - rowEnd) * statistics['mean cell size'])
+
+        return windowStatistics
+
+
+    @measuredStage('fill')
+    @keepingZipArchivesOpen
+    def fillFinalDtmWindow(self, headers, statistics, windows, window, finalDtmWindow, gridIndex = None):
+        """
+        Fills a window of the final DTM array with datasets intersecting it - datasets are loaded one at a time, and only
+        the rows of each dataset, which are inside the window, are parsed.
+
+        Args:
+            headers - tile index obtained with scanHeaders() function (datasets are loaded from its 'path' field)
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            windows - np.array() of ints - windows of all of the datasets in the final DTM array, obtained with
+                findTileWindows() function
+            window - tuple of ints - rowStart, rowEnd, colStart, colEnd window of the final DTM array to fill
+            finalDtmWindow - np.array() with a (rowEnd - rowStart, colEnd - colStart) shape, filled with nodata_value
+                (modified in place)
+            gridIndex - TileGridIndex() built over windows (None by default - built here)
+
+        Returns:
+            positions - list of ints - positions of the datasets, which were merged into the window, in merging order
+        """
+        tileIndex = self.asTileIndex(headers)
+        gridIndex = gridIndex if gridIndex is not None else TileGridIndex(windows)
+        rowStart, rowEnd, colStart, colEnd = window
+
+        positions = self.findMergingOrder(tileIndex, gridIndex.query(*window))
+
+        # only datasets overlapping other datasets need overlapRule (each window intersects at least itself)
+        overlapping = {position: len(gridIndex.query(*windows[position].tolist())) > 1 for position in positions}
+        aligned = self.findAlignedTiles(tileIndex, statistics)
+
+        counts = self.createOverlapCounts(finalDtmWindow)
+        counters = {position: counter for counter, position in enumerate(positions)}
+
+        def mergeDataset(counter, position):
+            self.log(f'Processing data from dataset #{counter + 1} - {tileIndex["name"][position]}')
+
+            tileRowStart, tileRowEnd, tileColStart, tileColEnd = windows[position].tolist()
+
+            # intersection of the dataset with the window - in coordinates of the window and of the dataset
+            interRowStart, interRowEnd = max(rowStart, tileRowStart), min(rowEnd, tileRowEnd)
+            interColStart, interColEnd = max(colStart, tileColStart), min(colEnd, tileColEnd)
+
+            if aligned[position]:
+                _, curDtm = self.loadSingleAscDtmRows(tileIndex['path'][position], interRowStart - tileRowStart,
+                                                      interRowEnd - tileRowStart)
+                curDtm = self.normalizeNoData(curDtm[:, interColStart - tileColStart:interColEnd - tileColStart],
+                                              tileIndex['nodata'][position], statistics)
+            else:
+                # datasets are resampled as a whole, because their rows are not matching rows of the target grid
+                curDtm = self.resampleTileToGrid(self.loadSingleAscDtm(tileIndex['path'][position])[1],
+                                                 tileIndex[position:position + 1], statistics)
+                curDtm = curDtm[interRowStart - tileRowStart:interRowEnd - tileRowStart,
+                                interColStart - tileColStart:interColEnd - tileColStart]
+            start = time.perf_counter()
+
+            windowSlice = np.s_[interRowStart - rowStart:interRowEnd - rowStart, interColStart - colStart:interColEnd - colStart]
+
+            if self.report:
+                self.collectTileReport(str(tileIndex['name'][position]), tileIndex['nodata'][position], finalDtmWindow,
+                                       windowSlice, curDtm, statistics['no data'],
+                                       edges=(interRowEnd == tileRowEnd, interColStart == tileColStart),
+                                       overlapping=overlapping[position])
+
+            if not overlapping[position]:
+                finalDtmWindow[windowSlice] = curDtm
+            else:
+                self.resolveOverlap(finalDtmWindow[windowSlice], curDtm, statistics['no data'],
+                                    counts[windowSlice] if counts is not None else None)
+
+            if self.report:
+                interWindow = (interRowStart, interRowEnd, interColStart, interColEnd)
+                laterWindows = [windows[later] for later in gridIndex.query(*interWindow)
+                                if counters[later] > counter] if overlapping[position] else []
+                self.collectFinalHeights(str(tileIndex['name'][position]), finalDtmWindow[windowSlice], interWindow,
+                                         laterWindows, statistics['no data'])
+
+            self.recordTile(str(tileIndex['name'][position]), 'merge', time.perf_counter() - start, curDtm.size)
+
+        self.mergeInBatches(self.findBatchingIndex(gridIndex), positions, mergeDataset)
+
+        # memory-mapped counts of streaming mode are needed only until all of the datasets are merged
+        if isinstance(counts, np.memmap):
+            countsPath = counts.filename
+            del counts
+            os.remove(countsPath)
+
+        return positions
+
+
+    @measuredStage('merge')
+    def merge(self, bbox = None):
+        """
+        Runs the whole merging pipeline on headers only (scanHeaders()), loading datasets one at a time, and exports the
+        final DTM. With bbox, only the datasets intersecting it are read (only their rows inside bbox are parsed), and the
+        final DTM covers only bbox.
+
+        Args:
+            bbox - tuple - (xmin, ymin, xmax, ymax) coordinates of the area to extract (None by default - whole extent)
+
+        Returns:
+            finalHeader - dictionary filled with informations which are stored in a header part of the output DTM
+            finalDtmArray - np.array() (np.memmap() in streaming mode) storing the final DTM
+        """
+        self.resetReport()
+
+        tileIndex = self.scanHeaders()
+
+        if len(tileIndex) == 0:
+            raise ValueError(f'There are no *.asc files in {self.inputCatalog}')
+
+        statistics = self.findStatisticsForDatasets(tileIndex)
+        finalShape = self.findFinalDtmArrayShape(statistics, tileIndex, None, None)
+        windows = self.findTileWindows(tileIndex, statistics, finalShape)
+
+        window = self.findBboxWindow(bbox, statistics, finalShape) if bbox is not None else (0, finalShape[0], 0, finalShape[1])
+
+        self.log('Preparing final DTM structure...\n')
+        self.pause()
+
+        finalDtmArray = self.createFinalArray((window[1] - window[0], window[3] - window[2]), statistics)
+
+        self.log('Merging DTMs...')
+        self.pause()
+
+        self.fillFinalDtmWindow(tileIndex, statistics, windows, window, finalDtmArray)
+
+        windowStatistics = self.findWindowStatistics(statistics, finalShape, window)
+        finalHeader = self.constructFinalHeader(finalDtmArray, windowStatistics)
+        self.exportFinalDtm(finalHeader, finalDtmArray)
+
+        if self.overviewLevels:
+            self.exportOverviews(finalDtmArray, windowStatistics)
+
+        if self.report:
+            self.exportReport(finalDtmArray, windowStatistics)
+
+        return finalHeader, finalDtmArray
+
+
+    def findIncrementalPaths(self):
+        """
+        Returns:
+            mosaicPath - String - path to the memory-mappable *.npy final DTM updated by mergeIncrementally() (the output
+                file itself for 'npy' outputFormat, '<outputFileName>_mosaic.npy' file in the output catalog otherwise)
+            manifestPath - String - path to the '<outputFileName>_manifest.json' file in the output catalog
+        """
+        outputStem = os.path.join(self.outputCatalog, os.path.splitext(self.outputFileName)[0])
+        mosaicPath = outputStem + '.npy' if self.outputFormat == 'npy' else outputStem + '_mosaic.npy'
+
+        return mosaicPath, outputStem + '_manifest.json'
+
+
+    def findFileHash(self, path, chunkSize = 8 * 1024 * 1024):
+        """
+        Args:
+            path - String - full file path
+            chunkSize - int - number of bytes read at once (8 MB by default)
+        Returns:
+            hash - String - SHA-1 hex digest of the file's content
+        """
+        fileHash = hashlib.sha1()
+
+        with openRawAscFile(path) as f:
+            for chunk in iter(lambda: f.read(chunkSize), b''):
+                fileHash.update(chunk)
+
+        return fileHash.hexdigest()
+
+
+    @keepingZipArchivesOpen
+    def createManifest(self, tileIndex, statistics, finalShape, windows, previousTiles = None):
+        """
+        Args:
+            tileIndex - tile index obtained with scanHeaders() function
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+            windows - np.array() of ints - windows of datasets in the final DTM array, obtained with findTileWindows()
+            previousTiles - dictionary - 'tiles' of the previous manifest - hashes of files with unchanged size and
+                modification time are taken from it (None by default - all files are hashed)
+
+        Returns:
+            manifest - dictionary with the placement parameters of the final DTM and name, path, size, modification time,
+                hash and window of each dataset (JSON serializable)
+        """
+        previousTiles = previousTiles or {}
+        tiles = {}
+
+        for tile, window in zip(tileIndex, windows.tolist()):
+            name, path = str(tile['name']), str(tile['path'])
+            size, mtimeNs = statAscFile(path)
+            previous = previousTiles.get(name, {})
+
+            unchanged = previous.get('size') == size and previous.get('mtime') == mtimeNs
+
+            tiles[name] = {
+                'path': os.path.abspath(path),
+                'size': size,
+                'mtime': mtimeNs,
+                'hash': previous['hash'] if unchanged else self.findFileHash(path),
+                'window': window
+            }
+
+        return {'placement': self.findPlacementParams(statistics, finalShape), 'tiles': tiles}
+
+
+    def findPlacementParams(self, statistics, finalShape):
+        """
+        Args:
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+
+        Returns:
+            placement - dictionary of parameters, which have to stay the same for an existing final DTM to be updated
+                incrementally
+        """
+        return {
+            'min X': statistics['min X'],
+            'min Y': statistics['min Y'],
+            'cell size': statistics['mean cell size'],
+            'no data': statistics['no data'],
+            'resampling': self.resampling,
+            'shape': list(finalShape),
+            'dtype': self.dtype.str,
+            'overlap rule': self.overlapRule,
+            'header components': list(self.headerComponents)
+        }
+
+
+    @measuredStage('incremental merge')
+    def mergeIncrementally(self):
+        """
+        Updates the final DTM created by a previous run, using a manifest kept next to the output (name, path, size,
+        modification time, hash and window of each dataset). Added, changed and removed datasets are detected, and only
+        their windows of the memory-mapped *.npy final DTM are merged again (from all of the datasets intersecting them).
+        If there is no manifest, or the extent, cell size, nodata_value, dtype or overlapRule changed, the whole final DTM
+        is merged. Outputs other than *.npy are exported again from the updated final DTM. With report, windows of datasets
+        next to the affected windows are merged again too (together with the cells below and on the left of them, which
+        their seams are compared with), and entries of the other datasets are taken from the previous report (a full merge
+        is done, if there is none) - so the report is the same as the one of a full merge.
+
+        Returns:
+            changes - dictionary with lists of 'added', 'changed' and 'removed' datasets, 'windows' merged again and
+                'full merge' flag
+        """
+        mosaicPath, manifestPath = self.findIncrementalPaths()
+
+        self.resetReport()
+
+        tileIndex = self.scanHeaders()
+
+        if len(tileIndex) == 0:
+            raise ValueError(f'There are no *.asc files in {self.inputCatalog}')
+
+        statistics = self.findStatisticsForDatasets(tileIndex)
+        finalShape = self.findFinalDtmArrayShape(statistics, tileIndex, None, None)
+        windows = self.findTileWindows(tileIndex, statistics, finalShape)
+        gridIndex = TileGridIndex(windows)
+
+        previousManifest = None
+
+        if os.path.exists(manifestPath) and os.path.exists(mosaicPath):
+            with open(manifestPath, 'r') as f:
+                previousManifest = json.load(f)
+
+        manifest = self.createManifest(tileIndex, statistics, finalShape, windows,
+                                       previousManifest['tiles'] if previousManifest else None)
+
+        fullMerge = previousManifest is None or previousManifest['placement'] != manifest['placement'] or \
+                    (self.report and not os.path.exists(self.findReportPath()))
+
+        if fullMerge:
+            self.log('Merging all of the datasets...')
+            self.pause()
+
+            changes = {'added': sorted(manifest['tiles']), 'changed': [], 'removed': []}
+            affectedWindows = [(0, finalShape[0], 0, finalShape[1])]
+
+            finalDtmArray = self.createFinalArrayOnDisk(finalShape, statistics, mosaicPath=mosaicPath)
+
+        else:
+            previousTiles, tiles = previousManifest['tiles'], manifest['tiles']
+
+            changes = {
+                'added': sorted(set(tiles) - set(previousTiles)),
+                'changed': sorted(name for name in set(tiles) & set(previousTiles)
+                                  if (tiles[name]['hash'], tiles[name]['window']) !=
+                                  (previousTiles[name]['hash'], previousTiles[name]['window'])),
+                'removed': sorted(set(previousTiles) - set(tiles))
+            }
+
+            self.log(f"Updating merged DTM - {len(changes['added'])} added, {len(changes['changed'])} changed, "
+                     f"{len(changes['removed'])} removed datasets...")
+            self.pause()
+
+            # both the old and the new windows of changed datasets have to be merged again
+            affectedWindows = [tuple(tiles[name]['window']) for name in changes['added'] + changes['changed']] + \
+                              [tuple(previousTiles[name]['window']) for name in changes['changed'] + changes['removed']]
+
+            # overlaps and seams of datasets next to the affected windows are changing too - they are merged again from
+            # their whole windows, so that their report entries are collected again
+            if self.report:
+                nextToWindows = [position for rowStart, rowEnd, colStart, colEnd in affectedWindows
+                                 for position in gridIndex.query(rowStart - 1, rowEnd + 1, colStart - 1, colEnd + 1)]
+                affectedWindows += [tuple(windows[position].tolist()) for position in nextToWindows]
+
+            affectedWindows = sorted(set(affectedWindows))
+
+            finalDtmArray = np.load(mosaicPath, mmap_mode='r+')
+
+        reportRecords = {}
+
+        for rowStart, rowEnd, colStart, colEnd in affectedWindows:
+            self.resetReport()
+
+            if self.report and not fullMerge:
+                # the window is merged again with a row below and a column on the left of it, so that seams of datasets
+                # are compared with the same cells as during a full merge (merged only from datasets merged earlier)
+                bufferRowEnd, bufferColStart = min(finalShape[0], rowEnd + 1), max(0, colStart - 1)
+                finalDtmBuffer = np.full((bufferRowEnd - rowStart, colEnd - bufferColStart), statistics['no data'],
+                                         dtype=self.dtype)
+
+                self.fillFinalDtmWindow(tileIndex, statistics, windows, (rowStart, bufferRowEnd, bufferColStart, colEnd),
+                                        finalDtmBuffer, gridIndex)
+
+                finalDtmArray[rowStart:rowEnd, colStart:colEnd] = finalDtmBuffer[:rowEnd - rowStart, colStart - bufferColStart:]
+            else:
+                finalDtmWindow = finalDtmArray[rowStart:rowEnd, colStart:colEnd]
+                finalDtmWindow[...] = statistics['no data']
+
+                self.fillFinalDtmWindow(tileIndex, statistics, windows, (rowStart, rowEnd, colStart, colEnd), finalDtmWindow,
+                                        gridIndex)
+
+            # records of datasets are taken from their own windows only (windows of datasets may overlap each other)
+            reportRecords.update((name, record) for name, record in self.reportRecords.items()
+                                 if fullMerge or manifest['tiles'][name]['window'] == [rowStart, rowEnd, colStart, colEnd])
+
+        self.reportRecords = reportRecords
+
+        finalDtmArray.flush()
+
+        finalHeader = self.constructFinalHeader(finalDtmArray, statistics)
+
+        # the *.npy final DTM is the output itself - only its header has to be written
+        if self.outputFormat == 'npy':
+            with open(os.path.splitext(mosaicPath)[0] + '.json', 'w') as f:
+                json.dump(finalHeader, f, indent=4)
+        elif affectedWindows:
+            self.exportFinalDtm(finalHeader, finalDtmArray)
+
+        if self.overviewLevels and affectedWindows:
+            self.exportOverviews(finalDtmArray, statistics)
+
+        if self.report:
+            previousEntries = {}
+
+            # datasets, which were not merged again, keep their previous entries
+            if not fullMerge:
+                with open(self.findReportPath(), 'r') as f:
+                    previousEntries = {name: entry for name, entry in json.load(f)['datasets'].items()
+                                       if name in manifest['tiles'] and name not in self.reportRecords}
+
+            self.exportReport(finalDtmArray, statistics, previousEntries)
+
+        del finalDtmArray
+
+        with open(manifestPath, 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+        changes['windows'] = [list(window) for window in affectedWindows]
+        changes['full merge'] = fullMerge
+
+        return changes
+
+
+    def findStripJobOptions(self):
+        """
+        Returns:
+            mergeOptions - dictionary - options of MergeAscDtms(), which are affecting the merged DTM, stored in strip jobs
+                (options of the nodes running the jobs, like threads or cacheCatalog, are left out)
+        """
+        return {
+            'dataSep': self.dataSep,
+            'outputFileName': self.outputFileName,
+            'headerComponents': list(self.headerComponents),
+            'parser': self.parser,
+            'precision': self.precision,
+            'floatFormat': self.floatFormat,
+            'dtype': str(self.dtype),
+            'outputFormat': self.outputFormat,
+            'tileSize': self.tileSize,
+            'compressionLevel': self.compressionLevel,
+            'overlapRule': self.overlapRule,
+            'overviewLevels': self.overviewLevels,
+            'overviewRule': self.overviewRule,
+            'targetCellSize': self.targetCellSize,
+            'targetOrigin': list(self.targetOrigin) if self.targetOrigin is not None else None,
+            'resampling': self.resampling,
+            'report': self.report
+        }
+
+
+    @measuredStage('plan strips')
+    def createStripJobs(self, numOfStrips):
+        """
+        Splits the final DTM into horizontal strips, which can be merged independently (e.g. on separate machines with
+        access to the datasets and the output catalog) - each strip job is a self-contained JSON file with the merge
+        options, the statistics, the strip's window and the records of the datasets intersecting it (with paths relative
+        to the plan's 'input catalog', so that jobs can be run from any working directory). Strip jobs are run with
+        runStripJob(), and their results are put together with concatenateStrips().
+
+        Args:
+            numOfStrips - int - number of strips (fewer, if the final DTM has fewer rows)
+        Returns:
+            planPath - String - path to '<output name>_strips.json' plan in the output catalog, listing strip jobs
+                ('<output name>_strip_<k>.json' files next to it)
+        """
+        tileIndex = self.scanHeaders()
+
+        if len(tileIndex) == 0:
+            raise ValueError(f'There are no *.asc files in {self.inputCatalog}')
+
+        statistics = self.findStatisticsForDatasets(tileIndex)
+        finalShape = self.findFinalDtmArrayShape(statistics, tileIndex, None, None)
+        gridIndex = TileGridIndex(self.findTileWindows(tileIndex, statistics, finalShape))
+
+        stem = os.path.splitext(self.outputFileName)[0]
+        stripBoundaries = np.unique(np.linspace(0, finalShape[0], max(1, numOfStrips) + 1).round().astype(np.int64))
+
+        self.log(f'Writing {len(stripBoundaries) - 1} strip jobs...\n')
+        self.pause()
+
+        jobFileNames = []
+
+        for strip, (rowStart, rowEnd) in enumerate(zip(stripBoundaries[:-1].tolist(), stripBoundaries[1:].tolist())):
+            window = (rowStart, rowEnd, 0, finalShape[1])
+
+            # datasets keep their order in the tile index, so that overlapping cells are resolved as in a single job
+            tiles = [{field: asPythonNumber(value) if field not in ('name', 'path') else str(value)
+                      for field, value in zip(tileIndex.dtype.names, tileIndex[position].tolist())}
+                     for position in gridIndex.query(*window)]
+
+            for tile in tiles:
+                tile['path'] = os.path.relpath(tile['path'], self.inputCatalog)
+
+            job = {
+                'strip': strip,
+                'window': list(window),
+                'final shape': list(finalShape),
+                'statistics': statistics,
+                'merge options': self.findStripJobOptions(),
+                'tiles': tiles,
+                'output': f'{stem}_strip_{strip}.npy'
+            }
+
+            jobFileNames.append(f'{stem}_strip_{strip}.json')
+
+            with open(os.path.join(self.outputCatalog, jobFileNames[-1]), 'w') as f:
+                json.dump(job, f, indent=4)
+
+        planPath = os.path.join(self.outputCatalog, f'{stem}_strips.json')
 
+        with open(planPath, 'w') as f:
+            json.dump({
+                'input catalog': os.path.abspath(self.inputCatalog),
+                'final shape': list(finalShape),
+                'statistics': statistics,
+                'merge options': self.findStripJobOptions(),
+                'jobs': jobFileNames
+            }, f, indent=4)
 
-    def __init__(self, inputCatalog, outputCatalog, dataSep = ' ', outputFileName = 'merged_dtm.asc',
-                 headerComponents = ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value']):
-        """
-        Args:
-            dataSep - String - data separator to be used while loading and exporting datasets (' ' by default)
-            outputFileName - String - name of the output DTM - should contain '*.asc' extension ('merged_dtm.asc' by default)
-        """
-        self.inputCatalog = inputCatalog
-        self.outputCatalog = outputCatalog
-        self.dataSep = dataSep
-        self.outputFileName = outputFileName
-        self.headerComponents = headerComponents
+        return planPath
 
 
-    def loadSingleAscDtm(self, path):
+    @measuredStage('strip')
+    def runStripJob(self, jobPath):
         """
+        Merges a single strip of the final DTM into '<output name>_strip_<k>.npy' file next to the job - only datasets
+        intersecting the strip are read, and only their rows inside it are parsed. The file appears only when the strip
+        is complete, so that finished strips can be told apart from interrupted ones. With report, records of the cells of
+        datasets inside the strip are written to '<output name>_strip_<k>_report.json' next to it (seams on the borders of
+        the strip are not compared).
+
         Args:
-            path - String, which is specifying the full file path to the *.asc DTM file
+            jobPath - String - path to a strip job, written by createStripJobs() (paths of its datasets are relative to
+                the input catalog)
         Returns:
-            header - dictionary filled with informations stored in a header part of an input *.asc DTM file
-            dtm - np.array() with a (nrows, ncols) shape, storing terrain heights (float values for appropriate heights,
-                int values for nodata_value)
+            stripPath - String - path to the merged strip
         """
+        with open(jobPath, 'r') as f:
+            job = json.load(f)
 
+        for tile in job['tiles']:
+            tile['path'] = os.path.join(self.inputCatalog, tile['path'])
 
-        with open(path, 'r') as f:
+        statistics = job['statistics']
+        finalShape = tuple(job['final shape'])
+        rowStart, rowEnd, colStart, colEnd = window = tuple(job['window'])
 
-            counter = 0
-            header = {}
-            dtm = []
+        tileIndex = self.createTileIndex([tuple(tile[field] for field, _ in TILE_INDEX_FIELDS) for tile in job['tiles']])
+        windows = self.findTileWindows(tileIndex, statistics, finalShape)
 
-            for l in f:
+        self.log(f"Merging strip #{job['strip'] + 1} - rows {rowStart}-{rowEnd - 1} of {finalShape[0]}...")
+        self.pause()
 
-                if l.endswith('\n'):
-                    l = l[:l.index('\n')]
+        self.resetReport()
 
-                if l.startswith(' '):
-                    l = l[1:]
+        stripPath = os.path.join(os.path.dirname(os.path.abspath(jobPath)), job['output'])
+        stripArray = self.createFinalArrayOnDisk((rowEnd - rowStart, colEnd - colStart), statistics,
+                                                 mosaicPath=stripPath + '.part.npy')
 
-                l = l.split(f'{self.dataSep}')
+        if len(tileIndex):
+            self.fillFinalDtmWindow(tileIndex, statistics, windows, window, stripArray)
 
-                if counter < 6:
-                    if any(map(lambda x: x in self.headerComponents, l)):
-                        counter += 1
-                        try:
-                            header[l[0]] = int(l[1])
-                        except:
-                            header[l[0]] = float(l[1])
+        stripArray.flush()
+        del stripArray
 
-                else:
-                    heights = []
-                    for el in l:
-                        try:
-                            heights.append(int(el))
-                        except:
-                            heights.append(float(el))
-                    dtm.append(heights)
+        if self.report:
+            with open(os.path.splitext(stripPath)[0] + '_report.json', 'w') as f:
+                json.dump(self.reportRecords, f, indent=4)
 
-        return header, np.array(dtm)
+        os.replace(stripPath + '.part.npy', stripPath)
 
+        return stripPath
 
-    def loadMultipleAscDtms(self):
+
+    @measuredStage('concatenate')
+    def concatenateStrips(self, planPath, removeStrips = False):
         """
+        Exports merged strips as the final DTM with the writer of outputFormat (and its overviews, if overviewLevels are
+        given, and the report of records of all of the strips, if report is True) - the writers read rows straight from
+        the memory-mapped strips (MergedStrips()), so that the final DTM is written once, with no intermediate file.
+
+        Args:
+            planPath - String - path to the plan of strip jobs, written by createStripJobs()
+            removeStrips - bool - if True, merged strips are removed after the export (False by default)
         Returns:
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function as values,
-                and file names as keys.
-            dtms - nested dictionary, storing multiple 'dtm' np.arrays(), obtained with loadSingleAscDtm() function as values,
-                and file names as keys.
+            finalHeader - dictionary filled with informations which are stored in a header part of the output DTM
         """
-        print('Loading datasets...')
+        with open(planPath, 'r') as f:
+            plan = json.load(f)
 
-        headers = {}
-        dtms = {}
+        planCatalog = os.path.dirname(os.path.abspath(planPath))
+        statistics = plan['statistics']
+        jobs = []
 
-        for i, file in enumerate(os.listdir(self.inputCatalog)):
+        for jobFileName in plan['jobs']:
+            with open(os.path.join(planCatalog, jobFileName), 'r') as f:
+                jobs.append(json.load(f))
 
-            if file.endswith('.asc'):
-                print(f'Loading dataset #{i + 1} - {file}')
-                header, dtm = self.loadSingleAscDtm(os.path.join(self.inputCatalog, file))
-                headers[file[:file.index('.')]] = header
-                dtms[file[:file.index('.')]] = dtm
+        missingStrips = [job['strip'] for job in jobs if not os.path.exists(os.path.join(planCatalog, job['output']))]
 
-        return headers, dtms
+        if missingStrips:
+            raise FileNotFoundError(f"Strips {', '.join(str(strip) for strip in missingStrips)} of {planPath} are not "
+                                    f"merged yet")
 
+        self.log(f'Concatenating {len(jobs)} strips...')
+        self.pause()
 
-    def findStatisticsForDatasets(self, headers):
+        finalDtmArray = MergedStrips([os.path.join(planCatalog, job['output']) for job in jobs],
+                                     [job['window'] for job in jobs], plan['final shape'], self.dtype)
+
+        finalHeader = self.constructFinalHeader(finalDtmArray, statistics)
+        self.exportFinalDtm(finalHeader, finalDtmArray)
+
+        if self.overviewLevels:
+            self.exportOverviews(finalDtmArray, statistics)
+
+        if self.report:
+            self.resetReport()
+
+            for job in jobs:
+                with open(os.path.join(planCatalog, os.path.splitext(job['output'])[0] + '_report.json'), 'r') as f:
+                    for name, record in json.load(f).items():
+                        self.addToReport(name, record)
+
+            self.exportReport(finalDtmArray, statistics)
+
+        del finalDtmArray
+
+        if removeStrips:
+            for job in jobs:
+                os.remove(os.path.join(planCatalog, job['output']))
+
+                if self.report:
+                    os.remove(os.path.join(planCatalog, os.path.splitext(job['output'])[0] + '_report.json'))
+
+        return finalHeader
+
+
+    def constructFinalHeader(self, finalDtmArray, statistics):
         """
         Args:
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
-                as values, and file names as keys.
-        Returns:
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
             statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
                 number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
                 are being processed.
+
+        Returns:
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
+                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
         """
-        print('Calculating statistics for datasets...\n')
-        time.sleep(.5)
+        self.log('Creating a header for merged DTM...\n')
+        self.pause()
 
         return {
-            'mean cols num': int(np.mean([v[self.headerComponents[0]] for v in headers.values()])),
-            'mean rows num': int(np.mean([v[self.headerComponents[1]] for v in headers.values()])),
-            'mean cell size': int(np.mean([v[self.headerComponents[4]] for v in headers.values()])),
-            'min X': min([v[self.headerComponents[2]] for v in headers.values()]),
-            'max X': max([v[self.headerComponents[2]] for v in headers.values()]),
-            'min Y': min([v[self.headerComponents[3]] for v in headers.values()]),
-            'max Y': max([v[self.headerComponents[3]] for v in headers.values()]),
-            'no data': int(np.mean([v[self.headerComponents[-1]] for v in headers.values()]))
+            self.headerComponents[0]  : finalDtmArray.shape[1],
+            self.headerComponents[1]  : finalDtmArray.shape[0],
+            self.headerComponents[2]  : statistics['min X'],
+            self.headerComponents[3]  : statistics['min Y'],
+            self.headerComponents[4]  : statistics['mean cell size'],
+            self.headerComponents[-1] : statistics['no data']
         }
 
 
-    def findSpatialDistributionOfDatasets(self, statistics):
+    def findOutputFormat(self, fileName):
         """
         Args:
-            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
-                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
-                are being processed.
+            fileName - String - name of the output DTM
         Returns:
-            numOfDatasetsAlongX - int - number of datasets which are spatially distributed along X axis (how many datasets
-                there are placed along X axis)
-            numOfDatasetsAlongY - int - number of datasets which are spatially distributed along Y axis (how many datasets
-                there are placed along Y axis)
+            outputFormat - String - format of the output DTM, based on the extension of fileName ('asc' for unknown ones)
         """
-        print('Checking the spatial distribution of datasets...\n')
-        time.sleep(.5)
+        extension = os.path.splitext(fileName)[1].lower().lstrip('.')
 
-        numOfDatasetsAlongX = int(
-            round((statistics['max X'] - statistics['min X']) / statistics['mean rows num'] * statistics['mean cell size'],
-                  0)) + 1
-        numOfDatasetsAlongY = int(
-            round((statistics['max Y'] - statistics['min Y']) / statistics['mean cols num'] * statistics['mean cell size'],
-                  0)) + 1
-        return numOfDatasetsAlongX, numOfDatasetsAlongY
+        if extension == 'tiff':
+            return 'tif'
 
+        return extension if extension in self.outputWriters else 'asc'
 
-    def sortDatasets(self, headers, numOfDatasetsAlongX):
+
+    @measuredStage('export')
+    def exportFinalDtm(self, finalHeader, finalDtmArray, fileName = None):
         """
+        Exports the final DTM with the writer of outputFormat.
+
         Args:
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
-                as values, and file names as keys.
-            numOfDatasetsAlongX - int - number of datasets which are spatially distributed along X axis (how many datasets
-                there are placed along X axis)
-        Returns:
-            sortedDatasets - np.array() storing lists of Strings, where each list was created by sorting datasets by Y
-                coordinates (descending) and the order of the Strings on each list is corresponding with the result of
-                sorting X coordinates (ascending)
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
+                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+            fileName - String - name of the output file in the output catalog (None by default - outputFileName)
         """
-        print('Sorting datasets by Y (descending) & by X (ascending)...\n')
-        time.sleep(.5)
+        self.writeOutputFile(finalHeader, finalDtmArray, fileName)
 
-        sortedByY = list(zip([k for k in headers.keys()], [v[self.headerComponents[2]] for v in headers.values()],
-                             [v[self.headerComponents[3]] for v in headers.values()]))
-        sortedByY.sort(key=itemgetter(2), reverse=True)
 
-        splittedBySimilarY = [sortedByY[i: i + numOfDatasetsAlongX] for i in range(0, len(sortedByY), numOfDatasetsAlongX)]
+    def writeOutputFile(self, finalHeader, finalDtmArray, fileName = None):
+        """
+        Writes a DTM with the writer of outputFormat (without measuring it as a separate 'export' stage).
 
-        sortedByXY = []
+        Args:
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of the output
+                file
+            finalDtmArray - np.array() storing the DTM
+            fileName - String - name of the output file in the output catalog (None by default - outputFileName)
+        """
+        getattr(self, self.outputWriters[self.outputFormat])(finalHeader, finalDtmArray, fileName)
 
-        for i in range(len(splittedBySimilarY)):
-            splittedBySimilarY[i].sort(key=itemgetter(1), reverse=False)
+        outputPath = os.path.join(self.outputCatalog, fileName or self.outputFileName)
+        self.addToActiveStages(cellsWritten=finalDtmArray.size,
+                               bytesWritten=os.path.getsize(outputPath) if os.path.exists(outputPath) else 0)
 
-            tmp = []
 
-            for j in range(len(splittedBySimilarY[i])):
-                tmp.append(splittedBySimilarY[i][j][0])
-            sortedByXY.append(tmp)
+    def exportFinalDtmAsAscFile(self, finalHeader, finalDtmArray, fileName = None):
+        """
+        Args:
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
+                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+            fileName - String - name of the output file in the output catalog (None by default - outputFileName)
+        """
+        self.log('Exporting final DTM as *.asc file...')
+
+        headerComponentsAndValues = list(zip(finalHeader.keys(), finalHeader.values()))
+
+        headerComponentsAndValues = [f'{self.dataSep}'.join(str(el) for el in headerComponentsAndValues[i]) + '\n' for i in
+                                     range(len(headerComponentsAndValues))]
 
-        return np.array(sortedByXY)
+        rowFormat = f'{self.dataSep}'.join([self.findHeightFormat(finalDtmArray.dtype)] * finalDtmArray.shape[1]) + '\n'
 
+        # rows are formatted in chunks of roughly writeBufferSize bytes (assuming ~10 characters per height)
+        rowsPerChunk = max(1, self.writeBufferSize // (10 * max(1, finalDtmArray.shape[1])))
 
-    def findTilesWithMaxCoords(self, headers):
+        with open(os.path.join(self.outputCatalog, fileName or self.outputFileName), 'w', buffering=self.writeBufferSize) as f:
+
+            for component in headerComponentsAndValues:
+                f.write(component)
+
+            for rowStart in range(0, finalDtmArray.shape[0], rowsPerChunk):
+                f.write(''.join(rowFormat % tuple(row) for row in finalDtmArray[rowStart:rowStart + rowsPerChunk].tolist()))
+
+
+    def findHeightFormat(self, dtype):
         """
         Args:
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
-                as values, and file names as keys.
+            dtype - np.dtype() of the final DTM array
         Returns:
-            xMaxTile - String - file name of the dataset with max X coordinate
-            yMaxTile - String - file name of the dataset with max Y coordinate
+            heightFormat - String - printf-style format used for exporting a single height
+        """
+        if self.floatFormat is not None:
+            return self.floatFormat
+
+        if np.issubdtype(dtype, np.integer):
+            return '%d'
+
+        if self.precision is not None:
+            return f'%.{int(self.precision)}f'
+
+        # the same text as str() of each height
+        if dtype == np.float64:
+            return '%s'
+
+        # significant digits needed to read each height of less precise floats back as exactly the same number (9 for
+        # float32) - finfo().precision (6 for float32) is only the number of digits, which survive the opposite way
+        return f'%.{int(ceil(1 + (np.finfo(dtype).nmant + 1) * log10(2)))}g'
+
+
+
+    def exportFinalDtmAsNpyFile(self, finalHeader, finalDtmArray, fileName = None, rowsPerChunk = 1024):
+        """
+        Exports terrain heights as a *.npy file and the header as a *.json sidecar file with the same name.
+
+        Args:
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
+                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+            fileName - String - name of the output file in the output catalog (None by default - outputFileName)
+            rowsPerChunk - int - number of rows copied at once (1024 by default)
+        """
+        self.log('Exporting final DTM as *.npy file...')
+
+        outputPath = os.path.join(self.outputCatalog, fileName or self.outputFileName)
+
+        npyDtm = np.lib.format.open_memmap(outputPath, mode='w+', dtype=finalDtmArray.dtype, shape=finalDtmArray.shape)
+
+        for rowStart in range(0, finalDtmArray.shape[0], rowsPerChunk):
+            npyDtm[rowStart:rowStart + rowsPerChunk] = finalDtmArray[rowStart:rowStart + rowsPerChunk]
+
+        npyDtm.flush()
+        del npyDtm
+
+        with open(os.path.splitext(outputPath)[0] + '.json', 'w') as f:
+            json.dump(finalHeader, f, indent=4)
+
+
+    def exportFinalDtmAsGeoTiffFile(self, finalHeader, finalDtmArray, fileName = None):
         """
-        print('Searching for tiles with max X & max Y coordinates...\n')
-        time.sleep(.5)
+        Exports the final DTM as an internally tiled, deflate-compressed GeoTIFF file, written one row of tiles at a time
+        (BigTIFF is written, if the uncompressed terrain heights exceed 4 GB).
 
-        for i, (k, v) in enumerate(headers.items()):
+        Args:
+            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
+                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
+            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
+                'nrows'/'ncols' parameter taken from datasets' headers.
+            fileName - String - name of the output file in the output catalog (None by default - outputFileName)
+        """
+        self.log('Exporting final DTM as *.tif file...')
+
+        nrows, ncols = finalDtmArray.shape
+        dtype = finalDtmArray.dtype.newbyteorder('<')
+        tileSize = self.tileSize
+        noData = finalHeader[self.headerComponents[-1]]
+        cellSize = finalHeader[self.headerComponents[4]]
+
+        bigTiff = finalDtmArray.nbytes >= 2 ** 32 - 2 ** 24
+        offsetType = 16 if bigTiff else 4
+
+        tileOffsets = []
+        tileByteCounts = []
+
+        with open(os.path.join(self.outputCatalog, fileName or self.outputFileName), 'wb',
+                  buffering=self.writeBufferSize) as f:
+
+            # the offset of the first IFD is written after all of the tiles
+            f.write(b'II' + (struct.pack('<HHHQ', 43, 8, 0, 0) if bigTiff else struct.pack('<HI', 42, 0)))
+
+            for rowStart in range(0, nrows, tileSize):
+                tilesRow = np.full((tileSize, -(-ncols // tileSize) * tileSize), noData, dtype=dtype)
+                tilesRow[:min(tileSize, nrows - rowStart), :ncols] = finalDtmArray[rowStart:rowStart + tileSize]
+
+                for colStart in range(0, tilesRow.shape[1], tileSize):
+                    tile = zlib.compress(np.ascontiguousarray(tilesRow[:, colStart:colStart + tileSize]).tobytes(),
+                                         self.compressionLevel)
+                    tileOffsets.append(f.tell())
+                    tileByteCounts.append(len(tile))
+                    f.write(tile)
+
+            # corner of the upper left cell - header coordinates of '*center' headers point to the center of a cell
+            xUpperLeft = finalHeader[self.headerComponents[2]]
+            yUpperLeft = finalHeader[self.headerComponents[3]] + nrows * cellSize
+
+            if 'center' in self.headerComponents[2].lower():
+                xUpperLeft -= cellSize / 2
+                yUpperLeft -= cellSize / 2
+
+            tags = [
+                (256, 4, [ncols]),
+                (257, 4, [nrows]),
+                (258, 3, [dtype.itemsize * 8]),
+                (259, 3, [8]),
+                (262, 3, [1]),
+                (277, 3, [1]),
+                (284, 3, [1]),
+                (322, 3, [tileSize]),
+                (323, 3, [tileSize]),
+                (324, offsetType, tileOffsets),
+                (325, offsetType, tileByteCounts),
+                (339, 3, [{'f': 3, 'i': 2, 'u': 1}[dtype.kind]]),
+                (33550, 12, [cellSize, cellSize, 0.0]),
+                (33922, 12, [0.0, 0.0, 0.0, xUpperLeft, yUpperLeft, 0.0]),
+                # GTModelTypeGeoKey = projected, GTRasterTypeGeoKey = PixelIsArea (*.asc files carry no CRS)
+                (34735, 3, [1, 1, 0, 2, 1024, 0, 1, 1, 1025, 0, 1, 1]),
+                (42113, 2, (str(noData) + '\0').encode('ascii'))
+            ]
+
+            self.writeTiffIfd(f, tags, bigTiff)
+
+
+    def writeTiffIfd(self, f, tags, bigTiff):
+        """
+        Writes values of tags, which don't fit into IFD entries, and the IFD itself at the end of the file, and points the
+        TIFF header to the IFD.
 
-            if i == 0:
+        Args:
+            f - file object of a TIFF file, opened in binary mode, with a header written at the beginning
+            tags - list of tuples - (tag, TIFF type: 2 - ASCII, 3 - SHORT, 4 - LONG, 12 - DOUBLE, 16 - LONG8, values)
+                sorted by tag
+            bigTiff - bool - if True, BigTIFF IFD structure is written
+        """
+        typeFormats = {2: 'B', 3: 'H', 4: 'I', 12: 'd', 16: 'Q'}
+        inlineSize, offsetFormat = (8, 'Q') if bigTiff else (4, 'I')
 
-                xMax = v[self.headerComponents[2]]
-                xMaxTile = k
+        entries = []
 
-                yMax = v[self.headerComponents[3]]
-                yMaxTile = k
+        for tag, tiffType, values in tags:
+            data = bytes(values) if tiffType == 2 else struct.pack(f'<{len(values)}{typeFormats[tiffType]}', *values)
 
+            if len(data) <= inlineSize:
+                entries.append((tag, tiffType, len(values), data.ljust(inlineSize, b'\0')))
             else:
+                if f.tell() % 2:
+                    f.write(b'\0')
+                entries.append((tag, tiffType, len(values), struct.pack(f'<{offsetFormat}', f.tell())))
+                f.write(data)
+
+        if f.tell() % 2:
+            f.write(b'\0')
+        ifdOffset = f.tell()
+
+        if bigTiff:
+            f.write(struct.pack('<Q', len(entries)))
+            for tag, tiffType, count, value in entries:
+                f.write(struct.pack('<HHQ', tag, tiffType, count) + value)
+            f.write(struct.pack('<Q', 0))
+        else:
+            f.write(struct.pack('<H', len(entries)))
+            for tag, tiffType, count, value in entries:
+                f.write(struct.pack('<HHI', tag, tiffType, count) + value)
+            f.write(struct.pack('<I', 0))
 
-                if v[self.headerComponents[2]] > xMax:
-                    xMax = v[self.headerComponents[2]]
-                    xMaxTile = k
+        f.seek(8 if bigTiff else 4)
+        f.write(struct.pack(f'<{offsetFormat}', ifdOffset))
 
-                if v[self.headerComponents[3]] > yMax:
-                    yMax = v[self.headerComponents[3]]
-                    yMaxTile = k
 
-        return xMaxTile, yMaxTile
+    def reduceBlocks(self, dtmChunk, factor, noData):
+        """
+        Args:
+            dtmChunk - np.array() - rows of the final DTM array (number of rows is a multiple of factor, except for the
+                last chunk)
+            factor - int - reduction factor - each factor x factor block of cells becomes one cell
+            noData - int/float - nodata_value of the final DTM array
+        Returns:
+            reducedChunk - np.array() with a (ceil(rows / factor), ceil(columns / factor)) shape - overviewRule of the
+                heights other than nodata_value in each block (nodata_value for blocks without any height) - incomplete
+                blocks at the right and bottom edges are reduced from the cells they have
+        """
+        rows, cols = dtmChunk.shape
+        reducedRows, reducedCols = ceil(rows / factor), ceil(cols / factor)
+
+        if (rows, cols) != (reducedRows * factor, reducedCols * factor):
+            paddedChunk = np.full((reducedRows * factor, reducedCols * factor), noData, dtype=dtmChunk.dtype)
+            paddedChunk[:rows, :cols] = dtmChunk
+            dtmChunk = paddedChunk
+
+        blocks = dtmChunk.reshape(reducedRows, factor, reducedCols, factor)
+        dataMask = blocks != noData
+        counts = dataMask.sum(axis=(1, 3))
+
+        if self.overviewRule == 'mean':
+            reduced = np.where(dataMask, blocks, 0).sum(axis=(1, 3), dtype=np.float64) / np.maximum(counts, 1)
+        elif self.overviewRule == 'min':
+            reduced = np.where(dataMask, blocks, np.inf).min(axis=(1, 3))
+        else:
+            reduced = np.where(dataMask, blocks, -np.inf).max(axis=(1, 3))
 
+        return np.where(counts > 0, reduced, noData)
 
-    def createFinalArrayFilledWithNoDataValues(self, statistics, headers, xMaxTile, yMaxTile):
+
+    def findOverviewStatistics(self, statistics, finalShape, factor):
         """
         Args:
             statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
                 number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
                 are being processed.
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
-                as values, and file names as keys.
-            xMaxTile - String - file name of the dataset with max X coordinate
-            yMaxTile - String - file name of the dataset with max Y coordinate
+            finalShape - tuple - (nrows, ncols) shape of the final DTM array
+            factor - int - reduction factor of the overview
 
         Returns:
-            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
-                'nrows'/'ncols' parameter taken from datasets' headers.
+            overviewStatistics - copy of statistics with 'mean cell size' multiplied by factor, and 'min X'/'min Y' of the
+                overview's lower left cell (the upper left corner is the same as the final DTM's one, and the overview
+                is extended to the right and to the bottom by incomplete blocks) - to be used by constructFinalHeader()
         """
-        print('Preparing final DTM structure...\n')
-        time.sleep(.5)
+        cellSize = statistics['mean cell size']
 
-        return np.ones((int((statistics['max Y'] - statistics['min Y']) / statistics['mean cell size'] + \
-                            headers[yMaxTile][self.headerComponents[1]]),
-                        int((statistics['max X'] - statistics['min X']) / statistics['mean cell size'] + \
-                            headers[xMaxTile][self.headerComponents[0]])), dtype=int) * statistics['no data']
+        # '*center' headers point to the center of the lower left cell, which grows with the reduction factor
+        centerShift = (factor - 1) * cellSize / 2 if 'center' in self.headerComponents[2].lower() else 0
 
+        overviewStatistics = dict(statistics)
+        overviewStatistics['mean cell size'] = asPythonNumber(cellSize * factor)
+        overviewStatistics['min X'] = asPythonNumber(statistics['min X'] + centerShift)
+        overviewStatistics['min Y'] = asPythonNumber(statistics['min Y'] + centerShift -
+                                                     (ceil(finalShape[0] / factor) * factor - finalShape[0]) * cellSize)
 
-    def fillFinalDtmArrayWithData(self, sortedDatasets, headers, statistics, dtms, finalDtmArray):
+        return overviewStatistics
+
+
+    def createOverviews(self, finalDtmArray, statistics, rowsPerChunk = 1024):
         """
+        Reduces the final DTM array to all of the overview levels in a single pass - chunks of rows are read once (also
+        from a memory-mapped final DTM array) and each level is reduced straight from the final DTM's cells.
+
         Args:
-            sortedDatasets - np.array() storing lists of Strings, where each list was created by sorting datasets by Y
-                coordinates (descending) and the order of the Strings on each list is corresponding with the result of
-                sorting X coordinates (ascending)
-            headers - nested dictionary, storing multiple 'header' dictionaries, obtained with loadSingleAscDtm() function
-                as values, and file names as keys.
+            finalDtmArray - np.array() (or np.memmap()) storing the final DTM
             statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
                 number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
                 are being processed.
-            dtms - nested dictionary, storing multiple 'dtm' np.arrays(), obtained with loadSingleAscDtm() function as values,
-                and file names as keys.
-            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
-                'nrows'/'ncols' parameter taken from datasets' headers.
+            rowsPerChunk - int - approximate number of rows of the final DTM array read at once (1024 by default)
+
+        Returns:
+            overviews - dictionary with reduction factors (overviewLevels) as keys and np.arrays() (np.memmaps() in
+                streaming mode) storing the overviews as values
         """
-        print('Merging DTMs...')
-        time.sleep(.5)
+        nrows, ncols = finalDtmArray.shape
+        stem = os.path.splitext(self.outputFileName)[0]
+        overviews = {}
 
-        counter = 0
+        for factor in self.overviewLevels:
+            overviewShape = (ceil(nrows / factor), ceil(ncols / factor))
+
+            if self.streaming:
+                overviews[factor] = self.createArrayOnDisk(
+                    overviewShape, statistics, os.path.join(self.outputCatalog, f'{stem}_overview_{factor}x_mosaic.npy'))
+            else:
+                overviews[factor] = np.full(overviewShape, statistics['no data'], dtype=self.dtype)
 
-        for i in range(len(sortedDatasets) - 1, -1, -1):
-            datasetsOnSimilarY = sortedDatasets[i]
+        # chunks are made of whole blocks of every level
+        blockRows = np.lcm.reduce(self.overviewLevels)
+        rowsPerChunk = max(1, rowsPerChunk // blockRows) * blockRows
 
-            for j in range(len(datasetsOnSimilarY)):
-                curDataset = datasetsOnSimilarY[j]
+        for rowStart in range(0, nrows, rowsPerChunk):
+            dtmChunk = np.asarray(finalDtmArray[rowStart:rowStart + rowsPerChunk])
 
-                print(f'Processing data from dataset #{counter + 1} - {curDataset}')
-                counter += 1
+            for factor, overview in overviews.items():
+                reducedChunk = self.reduceBlocks(dtmChunk, factor, statistics['no data'])
+                overview[rowStart // factor:rowStart // factor + reducedChunk.shape[0]] = reducedChunk
 
-                xCur, yCur = headers[curDataset][self.headerComponents[2]], headers[curDataset][self.headerComponents[3]]
+        return overviews
 
-                xDiff, yDiff = xCur - statistics['min X'], yCur - statistics['min Y']
 
-                xDiffAsCells = int(xDiff / statistics['mean cell size'])
-                yDiffAsCells = int(yDiff / statistics['mean cell size'])
+    @measuredStage('overviews')
+    def exportOverviews(self, finalDtmArray, statistics):
+        """
+        Creates overviews of the final DTM (createOverviews()) and exports each of them as '<output name>_overview_<factor>x'
+        file (in outputFormat) in the output catalog, with a header of its own cell size.
 
-                curDtm = dtms[curDataset]
+        Args:
+            finalDtmArray - np.array() (or np.memmap()) storing the final DTM
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
 
-                curRowInFinalDtmArray = -yDiffAsCells - 1
+        Returns:
+            fileNames - dictionary with reduction factors as keys and names of the exported overviews as values
+        """
+        self.log(f"Creating overviews of final DTM ({', '.join(f'{factor}x' for factor in self.overviewLevels)})...")
+        self.pause()
 
-                for k in range(curDtm.shape[0] - 1, -1, -1):
-                    curRowInCurDataset = curDtm[k]
+        stem, extension = os.path.splitext(self.outputFileName)
+        fileNames = {}
 
-                    curColInFinalDtmArray = xDiffAsCells
+        overviews = self.createOverviews(finalDtmArray, statistics)
 
-                    for l in range(len(curRowInCurDataset)):
-                        curHeightInCurDataset = curRowInCurDataset[l]
+        for factor in self.overviewLevels:
+            overview = overviews.pop(factor)
+            fileNames[factor] = f'{stem}_overview_{factor}x{extension}'
 
-                        if finalDtmArray[curRowInFinalDtmArray][curColInFinalDtmArray] == statistics['no data']:
-                            finalDtmArray[curRowInFinalDtmArray][curColInFinalDtmArray] = curHeightInCurDataset
+            overviewHeader = self.constructFinalHeader(overview, self.findOverviewStatistics(statistics, finalDtmArray.shape,
+                                                                                             factor))
+            self.writeOutputFile(overviewHeader, overview, fileNames[factor])
 
-                        curColInFinalDtmArray += 1
+            # memory-mapped overviews of streaming mode are needed only until they are exported
+            if isinstance(overview, np.memmap):
+                overviewPath = overview.filename
+                del overview
+                os.remove(overviewPath)
 
-                    curRowInFinalDtmArray -= 1
+        return fileNames
 
 
-    def constructFinalHeader(self, finalDtmArray, statistics):
+    def findReportPath(self):
+        """
+        Returns:
+            reportPath - String - path to the '<outputFileName>_report.json' file in the output catalog
+        """
+        return os.path.join(self.outputCatalog, f'{os.path.splitext(self.outputFileName)[0]}_report.json')
+
+
+    def findMosaicStatistics(self, entries, cells):
         """
         Args:
-            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
-                'nrows'/'ncols' parameter taken from datasets' headers.
-            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
-                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
-                are being processed.
+            entries - dictionary with dataset names as keys and entries of createReportEntry() as values - entries of all
+                of the datasets of the final DTM
+            cells - int - number of cells of the final DTM array
+        Returns:
+            mosaicStatistics - dictionary with number of 'cells' and of 'nodata cells', 'nodata fraction' and 'min', 'max'
+                and 'mean' of heights of the final DTM (None for a DTM without any height) - put together from 'final
+                heights' of the datasets (cells without any final height are nodata cells)
+        """
+        finalHeights = [entries[name]['final heights'] for name in sorted(entries) if entries[name]['final heights']['cells']]
+        dataCells = sum(heights['cells'] for heights in finalHeights)
+        heightsSum = sum(heights['sum'] for heights in finalHeights)
+
+        return {
+            'cells': cells,
+            'nodata cells': cells - dataCells,
+            'nodata fraction': (cells - dataCells) / cells if cells else None,
+            'min': min((heights['min'] for heights in finalHeights), default=None),
+            'max': max((heights['max'] for heights in finalHeights), default=None),
+            'mean': heightsSum / dataCells if dataCells else None
+        }
+
 
+    def createReportEntry(self, record):
+        """
+        Args:
+            record - dictionary - record of a dataset in reportRecords (see collectTileReport())
         Returns:
-            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
-                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
+            entry - dictionary - the dataset's 'nodata value', number of 'cells' and of 'nodata cells', 'nodata fraction',
+                'min', 'max' and 'mean' of heights, 'overlap' and 'seam' dictionaries with number of compared 'cells',
+                'mean abs difference' and 'max abs difference' of heights, and 'final heights' dictionary with number of
+                'cells' of the final DTM, which got their final heights from the dataset, and 'sum', 'min' and 'max' of them
         """
-        print('Creating a header for merged DTM...\n')
-        time.sleep(.5)
+        dataCells = record['cells'] - record['nodata cells']
 
         return {
-            self.headerComponents[0]  : finalDtmArray.shape[1],
-            self.headerComponents[1]  : finalDtmArray.shape[0],
-            self.headerComponents[2]  : statistics['min X'],
-            self.headerComponents[3]  : statistics['min Y'],
-            self.headerComponents[4]  : statistics['mean cell size'],
-            self.headerComponents[-1] : statistics['no data']
+            'nodata value': record['nodata value'],
+            'cells': record['cells'],
+            'nodata cells': record['nodata cells'],
+            'nodata fraction': record['nodata cells'] / record['cells'] if record['cells'] else None,
+            'min': record['min'],
+            'max': record['max'],
+            'mean': record['sum'] / dataCells if dataCells else None,
+            'overlap': {
+                'cells': record['overlap cells'],
+                'mean abs difference': record['overlap sum'] / record['overlap cells'] if record['overlap cells'] else None,
+                'max abs difference': record['overlap max']
+            },
+            'seam': {
+                'cells': record['seam cells'],
+                'mean abs difference': record['seam sum'] / record['seam cells'] if record['seam cells'] else None,
+                'max abs difference': record['seam max']
+            },
+            'final heights': {
+                'cells': record['final cells'],
+                'sum': record['final sum'],
+                'min': record['final min'],
+                'max': record['final max']
+            }
         }
 
 
-    def exportFinalDtmAsAscFile(self, finalHeader, finalDtmArray):
+    def summarizeDifferences(self, entries, key):
         """
         Args:
-            finalHeader - dictionary filled with informations which are going to be stored in a header part of an output
-                *.asc DTM file. Order of following informations is compatible with header parts of input datasets.
-            finalDtmArray - np.array() with a specific shape, which was calculated using coordinates substraction and
-                'nrows'/'ncols' parameter taken from datasets' headers.
+            entries - dictionary with dataset names as keys and entries of createReportEntry() as values
+            key - String - 'overlap' or 'seam'
+        Returns:
+            summary - dictionary with number of compared 'cells', 'mean abs difference' and 'max abs difference' of heights
+                of all of the datasets, and the first (by name) 'dataset' with the max abs difference
         """
-        print('Exporting final DTM as *.asc file...')
+        compared = {name: entry[key] for name, entry in entries.items() if entry[key]['cells']}
+        cells = sum(differences['cells'] for differences in compared.values())
+        worstDataset = max(sorted(compared), key=lambda name: compared[name]['max abs difference'], default=None)
 
-        headerComponentsAndValues = list(zip(finalHeader.keys(), finalHeader.values()))
+        return {
+            'cells': cells,
+            'mean abs difference': sum(differences['mean abs difference'] * differences['cells']
+                                       for differences in compared.values()) / cells if cells else None,
+            'max abs difference': compared[worstDataset]['max abs difference'] if worstDataset is not None else None,
+            'dataset': worstDataset
+        }
 
-        headerComponentsAndValues = [f'{self.dataSep}'.join(str(el) for el in headerComponentsAndValues[i]) + '\n' for i in
-                                     range(len(headerComponentsAndValues))]
 
-        dtmHeights = [f'{self.dataSep}'.join(str(el) for el in finalDtmArray[i]) + '\n' for i in range(finalDtmArray.shape[0])]
+    @measuredStage('report')
+    def exportReport(self, finalDtmArray, statistics, previousEntries = None):
+        """
+        Writes the validation report of the final DTM to '<output name>_report.json' in the output catalog - entries of
+        datasets collected while they were placed (reportRecords - see collectTileReport() and collectFinalHeights()),
+        statistics of the final DTM put together from them (findMosaicStatistics() - neither the final DTM array nor the
+        exported file is read again) and summaries of overlap disagreement and seam discontinuities of all of the datasets.
+
+        Args:
+            finalDtmArray - np.array() (or np.memmap()) storing the final DTM (only its size is used)
+            statistics - dictionary, which is storing some statistics informations about mean columns number, mean rows
+                number, mean cell size, min/max X, min/max Y and nodata_value, calculated using all of the datasets that
+                are being processed.
+            previousEntries - dictionary with dataset names as keys and entries of createReportEntry() as values - entries
+                of datasets, which are not in reportRecords (None by default)
+
+        Returns:
+            reportPath - String - path to the written report
+        """
+        self.log('Creating report of final DTM...')
+        self.pause()
+
+        entries = dict(previousEntries or {})
+        entries.update((name, self.createReportEntry(record)) for name, record in self.reportRecords.items())
+
+        report = {
+            'nodata value': statistics['no data'],
+            'final DTM': self.findMosaicStatistics(entries, finalDtmArray.size),
+            'datasets with other nodata value': sorted(name for name, entry in entries.items()
+                                                       if entry['nodata value'] != statistics['no data']),
+            'overlaps': self.summarizeDifferences(entries, 'overlap'),
+            'seams': self.summarizeDifferences(entries, 'seam'),
+            'datasets': {name: entries[name] for name in sorted(entries)}
+        }
 
-        with open(os.path.join(self.outputCatalog, self.outputFileName), 'w') as f:
+        reportPath = self.findReportPath()
 
-            for component in headerComponentsAndValues:
-                f.write(component)
+        with open(reportPath, 'w') as f:
+            json.dump(report, f, indent=4)
 
-            for height in dtmHeights:
-                f.write(height)
\ No newline at end of file
+        return reportPath
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# import necessary modules
+import numpy as np
+import json
+import os
+import pytest
+import shutil
+import zipfile
+import argparse
+from merge_multiple_asc_dtms_fncts import MergeAscDtms, loadStripPlan
+from merge_multiple_asc_dtms_benchmark import generateSyntheticTiles, benchmarkMergeStages
+from merge_multiple_asc_dtms import geoTiffTileSize
+
+
+def shiftTileHeights(path, shift, noData = -9999):
+    """
+    Args:
+        path - String - path to an *.asc tile written by generateSyntheticTiles()
+        shift - float - value added to heights of the tile (other than nodata_value)
+        noData - int - nodata_value of the tile (-9999 by default)
+    """
+    with open(path, 'r') as f:
+        lines = f.read().splitlines()
+
+    heights = np.array([line.split() for line in lines[6:]], dtype=np.float64)
+    heights[heights != noData] += shift
+
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines[:6]) + '\n')
+        np.savetxt(f, heights, fmt='%.2f')
+
+
+def test_incremental_report_equals_full_merge_report(tmp_path):
+    inputCatalog = str(tmp_path / 'input')
+    generateSyntheticTiles(inputCatalog, 4, 4, 30, overlap=3, seed=2)
+
+    for overlapRule, changedTiles in (('first', ['tile_001_002.asc']), ('last', ['tile_001_001.asc']),
+                                      ('mean', ['tile_000_000.asc', 'tile_003_003.asc'])):
+        incrementalCatalog, fullCatalog = str(tmp_path / f'incremental_{overlapRule}'), str(tmp_path / f'full_{overlapRule}')
+        os.makedirs(incrementalCatalog)
+        os.makedirs(fullCatalog)
+
+        options = dict(outputFileName='merged_dtm.npy', overlapRule=overlapRule, report=True, quiet=True, pauses=False)
+
+        MergeAscDtms(inputCatalog, incrementalCatalog, **options).mergeIncrementally()
+
+        for tileName in changedTiles:
+            shiftTileHeights(os.path.join(inputCatalog, tileName), 3.5)
+
+        changes = MergeAscDtms(inputCatalog, incrementalCatalog, **options).mergeIncrementally()
+        MergeAscDtms(inputCatalog, fullCatalog, **options).merge()
+
+        with open(os.path.join(incrementalCatalog, 'merged_dtm_report.json'), 'r') as f:
+            incrementalReport = json.load(f)
+        with open(os.path.join(fullCatalog, 'merged_dtm_report.json'), 'r') as f:
+            fullReport = json.load(f)
+
+        finalDtm = np.load(os.path.join(fullCatalog, 'merged_dtm.npy'))
+        heights = finalDtm[finalDtm != fullReport['nodata value']]
+
+        assert not changes['full merge']
+        assert incrementalReport == fullReport
+        assert np.array_equal(np.load(os.path.join(incrementalCatalog, 'merged_dtm.npy')), finalDtm)
+
+        # statistics of the final DTM are collected while datasets are placed
+        assert fullReport['final DTM']['nodata cells'] == finalDtm.size - heights.size
+        assert (fullReport['final DTM']['min'], fullReport['final DTM']['max']) == (heights.min(), heights.max())
+        assert np.isclose(fullReport['final DTM']['mean'], heights.mean(dtype=np.float64))
+
+        # the next round starts from the original heights
+        for tileName in changedTiles:
+            shiftTileHeights(os.path.join(inputCatalog, tileName), -3.5)
+
+
+def test_strip_jobs_run_from_another_working_directory(tmp_path, monkeypatch):
+    generateSyntheticTiles(str(tmp_path / 'input'), 3, 3, 20, seed=3)
+    os.makedirs(tmp_path / 'output')
+    os.makedirs(tmp_path / 'node')
+
+    # the input catalog is given relative to the working directory of the planning process
+    monkeypatch.chdir(tmp_path)
+    planPath = os.path.abspath(MergeAscDtms('input', 'output', outputFileName='merged_dtm.npy', quiet=True).createStripJobs(2))
+    _, expectedDtm = MergeAscDtms('input', 'output', outputFileName='expected_dtm.npy', quiet=True, pauses=False).merge()
+
+    monkeypatch.chdir(tmp_path / 'node')
+    merge, plan = loadStripPlan(planPath, quiet=True)
+
+    for jobFileName in plan['jobs']:
+        merge.runStripJob(os.path.join(os.path.dirname(planPath), jobFileName))
+
+    merge.concatenateStrips(planPath)
+
+    assert np.array_equal(np.load(tmp_path / 'output' / 'merged_dtm.npy'), expectedDtm)
+
+
+def test_exported_heights_are_read_back_bit_identical(tmp_path):
+    rng = np.random.default_rng(6)
+    headerComponents = ['ncols', 'nrows', 'xllcorner', 'yllcorner', 'cellsize', 'NODATA_value']
+
+    for dtype in ('float32', 'float64'):
+        heights = (rng.standard_normal((40, 50)) * 10.0 ** rng.integers(-3, 6, (40, 50))).astype(dtype)
+        heights[::7, ::5] = -9999
+
+        for parser in ('numpy', 'python'):
+            merge = MergeAscDtms(str(tmp_path), str(tmp_path), outputFileName=f'heights_{dtype}.asc', dtype=dtype,
+                                 parser=parser, quiet=True, pauses=False)
+            finalHeader = dict(zip(headerComponents, [heights.shape[1], heights.shape[0], 0, 0, 1, -9999]))
+
+            merge.exportFinalDtm(finalHeader, heights)
+            _, readHeights = merge.loadSingleAscDtm(str(tmp_path / f'heights_{dtype}.asc'))
+
+            assert readHeights.dtype == heights.dtype
+            assert readHeights.tobytes() == heights.tobytes()
+
+
+def test_parallel_loading_memory_maps_heights_parsed_by_workers(tmp_path):
+    generateSyntheticTiles(str(tmp_path / 'input'), 2, 3, 25, overlap=2, seed=4)
+
+    for parser in ('numpy', 'python'):
+        options = dict(parser=parser, quiet=True, pauses=False)
+        headers, dtms = MergeAscDtms(str(tmp_path / 'input'), str(tmp_path), **options).loadMultipleAscDtms()
+        parallelHeaders, parallelDtms = MergeAscDtms(str(tmp_path / 'input'), str(tmp_path), workers=2,
+                                                     **options).loadMultipleAscDtms()
+
+        assert parallelHeaders == headers
+        assert sorted(parallelDtms) == sorted(dtms)
+
+        for name, dtm in dtms.items():
+            assert isinstance(parallelDtms[name], np.memmap)
+            assert parallelDtms[name].dtype == dtm.dtype
+            assert np.array_equal(parallelDtms[name], dtm)
+
+
+def test_datasets_with_the_same_name_are_rejected(tmp_path):
+    inputCatalog = tmp_path / 'input'
+    generateSyntheticTiles(str(inputCatalog), 1, 2, 10, seed=5)
+    merge = MergeAscDtms(str(inputCatalog), str(tmp_path), quiet=True, pauses=False)
+
+    # members of two archives
+    for archiveName in ('a.zip', 'b.zip'):
+        with zipfile.ZipFile(inputCatalog / archiveName, 'w') as archive:
+            archive.write(inputCatalog / 'tile_000_000.asc', 'tile_000_000.asc')
+
+    os.remove(inputCatalog / 'tile_000_000.asc')
+
+    with pytest.raises(ValueError, match="same name 'tile_000_000'"):
+        merge.merge()
+
+    # a plain and a compressed file
+    os.remove(inputCatalog / 'b.zip')
+    shutil.copy(inputCatalog / 'tile_001_000.asc', inputCatalog / 'tile_001_000.asc.gz')
+
+    with pytest.raises(ValueError, match="same name 'tile_001_000'"):
+        merge.loadMultipleAscDtms()
+
+
+def test_geotiff_tile_size_has_to_be_a_positive_multiple_of_16(tmp_path):
+    for tileSize in (0, -16, 100, 256.0):
+        with pytest.raises(ValueError, match='positive multiple of 16'):
+            MergeAscDtms(str(tmp_path), str(tmp_path), outputFileName='merged_dtm.tif', tileSize=tileSize, quiet=True)
+
+        with pytest.raises(argparse.ArgumentTypeError, match='positive multiple of 16'):
+            geoTiffTileSize(str(tileSize))
+
+    assert MergeAscDtms(str(tmp_path), str(tmp_path), outputFileName='merged_dtm.tif', tileSize=16, quiet=True).tileSize == 16
+    assert geoTiffTileSize('512') == 512
+
+
+def test_benchmark_measures_memory_of_each_stage(tmp_path):
+    generateSyntheticTiles(str(tmp_path / 'input'), 2, 2, 100, seed=7)
+
+    for streaming in (False, True):
+        stages = benchmarkMergeStages(MergeAscDtms(str(tmp_path / 'input'), str(tmp_path), outputFileName='merged_dtm.npy',
+                                                   streaming=streaming, quiet=True, pauses=False))
+
+        assert stages['load']['measures'] == ('headers' if streaming else 'datasets')
+        assert (stages['load']['cells per second'] is None) == streaming
+
+        # the final DTM array is allocated in memory (and memory-mapped in streaming mode)
+        finalDtmBytes = 200 * 200 * np.dtype('float32').itemsize
+        assert (stages['allocate']['retained memory'] >= finalDtmBytes) != streaming
+        assert stages['stats']['peak memory'] < finalDtmBytes